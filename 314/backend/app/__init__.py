@@ -3,8 +3,10 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from app.services.replicas import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends GET requests' queries to a read replica when one is configured
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 migrate = Migrate()
 
@@ -12,15 +14,18 @@ def create_app(config_class='config.Config'):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
         
     CORS(app,
         resources={
             r"/api/*": {
                 "origins": ["http://localhost:5173", "http://127.0.0.1:5173"],
                 "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-                "allow_headers": ["Content-Type", "Authorization"],
+                "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key", "X-Read-Primary"],
                 "supports_credentials": True,
-                "expose_headers": ["Content-Type", "Authorization"],
+                "expose_headers": ["Content-Type", "Authorization", "X-Next-Cursor", "Link", "ETag", "Idempotent-Replayed", "X-Read-Primary"],
                 "max_age": 600
             }
         }
@@ -30,6 +35,29 @@ def create_app(config_class='config.Config'):
     jwt.init_app(app)
     migrate.init_app(app, db)
     
+    from app.services.metrics import request_metrics
+    from app.services.replicas import replica_router
+    from app.services.view_counter import view_counter
+    from app.services.audit import audit_writer
+    from app.services.stats import stats_cache
+    from app.services.categories import category_cache
+    from app.services.search import search_index
+    from app.services.matching import matching_index
+    from app.services.passwords import password_hasher
+    from app.services.events import event_bus
+    from app.services.reports import report_scheduler
+    request_metrics.init_app(app)
+    replica_router.init_app(app)
+    view_counter.init_app(app)
+    audit_writer.init_app(app)
+    stats_cache.init_app(app)
+    category_cache.init_app(app)
+    search_index.init_app(app)
+    matching_index.init_app(app)
+    password_hasher.init_app(app)
+    event_bus.init_app(app)
+    report_scheduler.init_app(app)
+    
     # Register all blueprints
     from app.routes import auth, users, requests, volunteers, admin
     from app.routes import user_admin, pin, csr, system, password_recovery
@@ -44,5 +72,8 @@ def create_app(config_class='config.Config'):
     app.register_blueprint(csr.bp)
     app.register_blueprint(system.bp)
     app.register_blueprint(password_recovery.bp)
+    
+    from app.commands import register_commands
+    register_commands(app)
  
     return app
@@ -0,0 +1,63 @@
+import click
+from flask.cli import with_appcontext
+
+@click.command('reconcile-ratings')
+@with_appcontext
+def reconcile_ratings_command():
+    """Recompute every volunteer's rating and review count from their reviews."""
+    from app.services.ratings import reconcile_ratings
+    count = reconcile_ratings()
+    click.echo(f'Reconciled ratings for {count} volunteers')
+
+@click.command('purge-reset-tokens')
+@with_appcontext
+def purge_reset_tokens_command():
+    """Delete expired password reset tokens. Intended to run from cron."""
+    from app import db
+    from app.models.user import PasswordResetToken
+    count = PasswordResetToken.purge_expired()
+    db.session.commit()
+    click.echo(f'Purged {count} expired reset tokens')
+
+@click.command('run-reports')
+@with_appcontext
+def run_reports_command():
+    """Run every due scheduled report once. Intended to run from cron."""
+    from app.services.reports import report_scheduler
+    count = report_scheduler.run_pending()
+    click.echo(f'Ran {count} scheduled reports')
+
+@click.command('purge-idempotency-keys')
+@with_appcontext
+def purge_idempotency_keys_command():
+    """Delete expired Idempotency-Key records. Intended to run from cron."""
+    from datetime import timedelta
+    from flask import current_app
+    from app import db
+    from app.models.system import IdempotencyKey
+    count = IdempotencyKey.purge_expired(timedelta(seconds=current_app.config['IDEMPOTENCY_KEY_TTL']))
+    db.session.commit()
+    click.echo(f'Purged {count} expired idempotency keys')
+
+@click.command('delete-user')
+@click.argument('user_id', type=int)
+@with_appcontext
+def delete_user_command(user_id):
+    """Delete a user and everything that references them, reporting progress."""
+    from app.models.user import User
+    from app.services.accounts import delete_user_cascade
+    from app.services.stats import stats_cache
+    from app.utils.auth import invalidate_user
+    if User.query.get(user_id) is None:
+        raise click.ClickException(f'No user with id {user_id}')
+    count = delete_user_cascade(user_id, progress=lambda deleted: click.echo(f'Deleted {deleted} help requests...'))
+    invalidate_user(user_id)
+    stats_cache.invalidate()
+    click.echo(f'Deleted user {user_id} and {count} help requests')
+
+def register_commands(app):
+    app.cli.add_command(reconcile_ratings_command)
+    app.cli.add_command(purge_reset_tokens_command)
+    app.cli.add_command(run_reports_command)
+    app.cli.add_command(purge_idempotency_keys_command)
+    app.cli.add_command(delete_user_command)
@@ -1,8 +1,21 @@
+from sqlalchemy.dialects import mysql
 from app import db
 from datetime import datetime
 
 class HelpRequest(db.Model):
     __tablename__ = 'help_requests'
+    __table_args__ = (
+        # GET /api/requests: status filter ordered by created_at, id
+        db.Index('ix_help_requests_status_created_at', 'status', 'created_at', 'id'),
+        db.Index('ix_help_requests_status_urgency_created_at', 'status', 'urgency', 'created_at'),
+        db.Index('ix_help_requests_category_status_created_at', 'category_id', 'status', 'created_at'),
+        # GET /api/requests/my-requests
+        db.Index('ix_help_requests_requester_created_at', 'requester_id', 'created_at'),
+        # GET /api/requests?q= on MySQL (see SearchIndex.uses_fulltext)
+        db.Index(
+            'ix_help_requests_fulltext', 'title', 'description', 'location', mysql_prefix='FULLTEXT'
+        ).ddl_if(dialect='mysql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     requester_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -14,9 +27,14 @@ class HelpRequest(db.Model):
     status = db.Column(db.String(50), default='pending')  # pending, accepted, completed, cancelled
     photo_url = db.Column(db.String(500))
     view_count = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    completed_at = db.Column(db.DateTime)
+    # Non-null: GET /api/requests pages on (created_at or updated_at, id)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    # Microseconds on MySQL too: GET /<id> validates against it
+    updated_at = db.Column(
+        db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql'),
+        nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
+    completed_at = db.Column(db.DateTime, index=True)
     
     # Relationships
     category = db.relationship('Category', backref='requests')
@@ -49,13 +67,19 @@ class Category(db.Model):
 
 class VolunteerOffer(db.Model):
     __tablename__ = 'volunteer_offers'
+    __table_args__ = (
+        # accepted-tasks / my-offers
+        db.Index('ix_volunteer_offers_volunteer_status', 'volunteer_id', 'status'),
+        # One offer per volunteer and request; create_offer upserts against it
+        db.UniqueConstraint('request_id', 'volunteer_id', name='uq_volunteer_offers_request_volunteer'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     request_id = db.Column(db.Integer, db.ForeignKey('help_requests.id'), nullable=False)
     volunteer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.String(50), default='pending')  # pending, accepted, rejected, withdrawn
     message = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     volunteer = db.relationship('User', foreign_keys=[volunteer_id])
     
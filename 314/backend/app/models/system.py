@@ -3,6 +3,11 @@ from datetime import datetime
 
 class SystemLog(db.Model):
     __tablename__ = 'system_logs'
+    __table_args__ = (
+        # audit trail per user and log filtering by action, newest first
+        db.Index('ix_system_logs_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_system_logs_action_timestamp', 'action', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -24,8 +29,36 @@ class SystemLog(db.Model):
             'timestamp': self.timestamp.isoformat()
         }
 
+# A client-supplied Idempotency-Key and the response it produced, so a retried
+# POST is answered from here instead of running again. status_code is NULL
+# while the first request is still in flight.
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_key'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    # SHA-256 of the method, path and body the key was first used with
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    mimetype = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    @classmethod
+    def purge_expired(cls, max_age):
+        cutoff = datetime.utcnow() - max_age
+        return cls.query.filter(cls.created_at < cutoff).delete(synchronize_session=False)
+
 class ScheduledReport(db.Model):
     __tablename__ = 'scheduled_reports'
+    __table_args__ = (
+        # the scheduler's due-report claim
+        db.Index('ix_scheduled_reports_active_next_run', 'is_active', 'next_run'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -36,3 +69,11 @@ class ScheduledReport(db.Model):
     last_run = db.Column(db.DateTime)
     next_run = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Execution state, see app/services/reports.py: a run lease, the end of
+    # the window the last run covered, running totals as JSON, and the file
+    # the last run wrote
+    claimed_until = db.Column(db.DateTime)
+    watermark = db.Column(db.DateTime)
+    state = db.Column(db.Text)
+    last_output = db.Column(db.String(500))
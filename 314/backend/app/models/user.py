@@ -1,6 +1,8 @@
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from app.services.passwords import password_hasher
+from datetime import datetime, timedelta
+import hashlib
+import secrets
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -11,9 +13,7 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(50), nullable=False)
     is_active = db.Column(db.Boolean, default=True)
-    reset_token = db.Column(db.String(255), nullable=True)
-    reset_token_expiry = db.Column(db.DateTime, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     profile = db.relationship('UserProfile', backref='user', uselist=False, cascade='all, delete-orphan')
@@ -23,10 +23,13 @@ class User(db.Model):
     reviews_received = db.relationship('VolunteerReview', backref='volunteer', foreign_keys='VolunteerReview.volunteer_id')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self):
         return {
@@ -39,11 +42,39 @@ class User(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
 
+class PasswordResetToken(db.Model):
+    __tablename__ = 'password_reset_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # SHA-256 of the emailed token; the token itself is never stored
+    token_digest = db.Column(db.String(64), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    @classmethod
+    def issue(cls, user_id, lifetime=timedelta(hours=1)):
+        token = secrets.token_urlsafe(32)
+        db.session.add(cls(
+            token_digest=cls.digest(token),
+            user_id=user_id,
+            expires_at=datetime.utcnow() + lifetime
+        ))
+        return token
+    
+    @classmethod
+    def purge_expired(cls):
+        return cls.query.filter(cls.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+
 class UserProfile(db.Model):
     __tablename__ = 'user_profiles'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     full_name = db.Column(db.String(200))
     phone = db.Column(db.String(20))
     address = db.Column(db.Text)
@@ -56,6 +87,12 @@ class UserProfile(db.Model):
 
 class VolunteerBlacklist(db.Model):
     __tablename__ = 'volunteer_blacklist'
+    __table_args__ = (
+        # One entry per pair; the bulk endpoints upsert against it
+        db.UniqueConstraint('pin_id', 'volunteer_id', name='uq_volunteer_blacklist_pin_volunteer'),
+        # Recommendations look up the PINs that listed a volunteer
+        db.Index('ix_volunteer_blacklist_volunteer_id', 'volunteer_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     pin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -67,6 +104,12 @@ class VolunteerBlacklist(db.Model):
 
 class VolunteerShortlist(db.Model):
     __tablename__ = 'volunteer_shortlist'
+    __table_args__ = (
+        # One entry per pair; the bulk endpoints upsert against it
+        db.UniqueConstraint('pin_id', 'volunteer_id', name='uq_volunteer_shortlist_pin_volunteer'),
+        # Recommendations look up the PINs that listed a volunteer
+        db.Index('ix_volunteer_shortlist_volunteer_id', 'volunteer_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     pin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -80,12 +123,13 @@ class VolunteerReview(db.Model):
     __tablename__ = 'volunteer_reviews'
     
     id = db.Column(db.Integer, primary_key=True)
-    pin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    volunteer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    request_id = db.Column(db.Integer, db.ForeignKey('help_requests.id'), nullable=True)
+    # Indexed for the set-based deletes of a user or their requests
+    pin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    volunteer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    request_id = db.Column(db.Integer, db.ForeignKey('help_requests.id'), nullable=True, index=True)
     rating = db.Column(db.Integer, nullable=False)
     comment = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     pin = db.relationship('User', foreign_keys=[pin_id])
     request = db.relationship('HelpRequest')
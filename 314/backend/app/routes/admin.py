@@ -1,27 +1,26 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app
 from app import db
-from app.models.user import User
 from app.models.request import Category
+from app.services.categories import category_cache
+from app.services.stats import stats_cache
+from app.utils.auth import roles_required
+from app.utils.http_cache import is_fresh, add_validators, not_modified
 
 bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
-def require_admin():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    return user and user.role in ['admin', 'manager']
-
 @bp.route('/categories', methods=['GET'])
 def get_categories():
-    categories = Category.query.filter_by(is_active=True).all()
-    return jsonify([{'id': c.id, 'name': c.name, 'description': c.description} for c in categories]), 200
+    body, etag = category_cache.get()
+    cache_control = f'public, max-age={current_app.config["CATEGORY_MAX_AGE"]}'
+    if is_fresh(etag):
+        return not_modified(etag, cache_control)
+    
+    response = current_app.response_class(body, mimetype='application/json')
+    return add_validators(response, etag, cache_control), 200
 
 @bp.route('/categories', methods=['POST'])
-@jwt_required()
+@roles_required('admin', 'manager')
 def create_category():
-    if not require_admin():
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     category = Category(
         name=data['name'],
@@ -30,25 +29,11 @@ def create_category():
     
     db.session.add(category)
     db.session.commit()
+    category_cache.invalidate()
     
     return jsonify({'id': category.id, 'name': category.name}), 201
 
 @bp.route('/stats', methods=['GET'])
-@jwt_required()
+@roles_required('admin', 'manager')
 def get_stats():
-    print("Incoming headers: ", request.headers)
-    if not require_admin():
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    total_users = User.query.count()
-    active_users = User.query.filter_by(is_active=True).count()
-    from app.models.request import HelpRequest
-    total_requests = HelpRequest.query.count()
-    completed_requests = HelpRequest.query.filter_by(status='completed').count()
-    
-    return jsonify({
-        'total_users': total_users,
-        'active_users': active_users,
-        'total_requests': total_requests,
-        'completed_requests': completed_requests
-    }), 200
+    return jsonify(stats_cache.get()), 200
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 from app import db
 from app.models.user import User, UserProfile
+from app.services.stats import stats_cache
+from app.utils.auth import load_current_user
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -30,6 +32,7 @@ def register():
     
     db.session.add(user)
     db.session.commit()
+    stats_cache.bump(total_users=1, active_users=1)
     
     access_token = create_access_token(identity=str(user.id))
     return jsonify({
@@ -50,6 +53,11 @@ def login():
     if not user.is_active:
         return jsonify({'error': 'Account is deactivated'}), 403
     
+    # Upgrade hashes made with older cost parameters while the password is known
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+        db.session.commit()
+    
     access_token = create_access_token(identity=str(user.id))
     return jsonify({
         'access_token': access_token,
@@ -59,7 +67,5 @@ def login():
 @bp.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
-    print("Incoming headers: ", request.headers)
-    user_id = int(get_jwt_identity())    
-    user = User.query.get(user_id)
+    user = load_current_user()
     return jsonify(user.to_dict()), 200
@@ -3,22 +3,14 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.user import User, UserProfile
 from app.models.request import VolunteerOffer, HelpRequest
-from app.models.system import SystemLog
+from app.services.audit import log_action
+from app.services.events import event_bus
+from app.services.stats import stats_cache
+from app.utils.loaders import get_loader
 from datetime import datetime
 
 bp = Blueprint('csr', __name__, url_prefix='/api/csr')
 
-def log_action(action, details):
-    user_id = get_jwt_identity()
-    log = SystemLog(
-        user_id=user_id,
-        action=action,
-        details=details,
-        ip_address=request.remote_addr
-    )
-    db.session.add(log)
-    db.session.commit()
-
 @bp.route('/accepted-tasks', methods=['GET'])
 @jwt_required()
 def get_accepted_tasks():
@@ -28,10 +20,11 @@ def get_accepted_tasks():
         volunteer_id=user_id,
         status='accepted'
     ).all()
+    help_requests = get_loader(HelpRequest).load_many(offer.request_id for offer in offers)
     
     result = []
     for offer in offers:
-        req = HelpRequest.query.get(offer.request_id)
+        req = help_requests[offer.request_id]
         result.append({
             'id': offer.id,
             'request_id': req.id,
@@ -60,6 +53,7 @@ def complete_task(offer_id):
     
     # Mark request as completed
     req = HelpRequest.query.get(offer.request_id)
+    newly_completed = req.status != 'completed'
     req.status = 'completed'
     req.completed_at = datetime.utcnow()
     
@@ -68,8 +62,15 @@ def complete_task(offer_id):
     if profile:
         profile.completed_tasks += 1
     
+    # Serialized after the flush sets updated_at but before the commit
+    # expires the row, which would cost a reload
+    db.session.flush()
+    payload = req.to_dict()
     db.session.commit()
+    if newly_completed:
+        stats_cache.bump(completed_requests=1)
+    event_bus.publish('request.completed', payload)
     
-    log_action('TASK_COMPLETED', f'Completed task for request ID {req.id}')
+    log_action('TASK_COMPLETED', f'Completed task for request ID {payload["id"]}')
     
     return jsonify({'message': 'Task marked as completed'}), 200
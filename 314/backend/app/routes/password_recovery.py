@@ -1,8 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from app.models.user import User
-from datetime import datetime, timedelta
-import secrets
+from app.models.user import User, PasswordResetToken
+from datetime import datetime
 
 bp = Blueprint('password_recovery', __name__, url_prefix='/api/auth')
 
@@ -17,10 +16,8 @@ def forgot_password():
         # Don't reveal if user exists
         return jsonify({'message': 'If email exists, reset link has been sent'}), 200
     
-    # Generate reset token
-    reset_token = secrets.token_urlsafe(32)
-    user.reset_token = reset_token
-    user.reset_token_expiry = datetime.utcnow() + timedelta(hours=1)
+    # Generate reset token; only its digest is stored
+    reset_token = PasswordResetToken.issue(user.id)
     
     db.session.commit()
     
@@ -37,17 +34,24 @@ def reset_password():
     token = data.get('token')
     new_password = data.get('password')
     
-    user = User.query.filter_by(reset_token=token).first()
+    if not token:
+        return jsonify({'error': 'Invalid or expired token'}), 400
+    
+    reset_token = PasswordResetToken.query.filter_by(
+        token_digest=PasswordResetToken.digest(token)
+    ).first()
     
-    if not user or not user.reset_token_expiry:
+    if not reset_token:
         return jsonify({'error': 'Invalid or expired token'}), 400
     
-    if datetime.utcnow() > user.reset_token_expiry:
+    if datetime.utcnow() > reset_token.expires_at:
         return jsonify({'error': 'Token has expired'}), 400
     
+    user = User.query.get(reset_token.user_id)
     user.set_password(new_password)
-    user.reset_token = None
-    user.reset_token_expiry = None
+    
+    # Using one token invalidates every outstanding token for the user
+    PasswordResetToken.query.filter_by(user_id=user.id).delete(synchronize_session=False)
     
     db.session.commit()
     
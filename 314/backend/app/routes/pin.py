@@ -1,42 +1,78 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models.user import User, VolunteerBlacklist, VolunteerShortlist, VolunteerReview, UserProfile
+from app.models.user import User, VolunteerBlacklist, VolunteerShortlist, VolunteerReview
 from app.models.request import VolunteerOffer
-from app.models.system import SystemLog
+from app.services.audit import log_action
+from app.services.matching import matching_index
+from app.services.ratings import apply_review
+from app.utils.bulk import InvalidBatch, parse_batch, missing_ids, upsert
+from app.utils.idempotency import commit_view, idempotent
+from app.utils.loaders import get_loader
+from datetime import datetime
 
 bp = Blueprint('pin', __name__, url_prefix='/api/pin')
 
-def log_action(action, details):
-    user_id = get_jwt_identity()
-    log = SystemLog(
-        user_id=user_id,
-        action=action,
-        details=details,
-        ip_address=request.remote_addr
-    )
-    db.session.add(log)
-    db.session.commit()
+def _save_list_entries(model, pin_id, items, update_columns=(), after_commit=None):
+    # Adds the volunteers to the PIN's blacklist or shortlist in one upsert;
+    # volunteers already on it keep their entry. Returns the unknown ids.
+    volunteer_ids = [item['volunteer_id'] for item in items]
+    missing = missing_ids(User.id, volunteer_ids)
+    if missing:
+        return missing
+    
+    now = datetime.utcnow()
+    rows = []
+    for item in items:
+        row = {'pin_id': pin_id, 'volunteer_id': item['volunteer_id'], 'created_at': now}
+        row.update((column, item.get(column, '')) for column in update_columns)
+        rows.append(row)
+    upsert(model, rows, key=('pin_id', 'volunteer_id'), update_columns=update_columns)
+    callbacks = [lambda: matching_index.forget_volunteers(volunteer_ids)]
+    if after_commit is not None:
+        callbacks.append(after_commit)
+    commit_view(*callbacks)
+    return []
+
+def _blacklist(pin_id, items):
+    def audit():
+        for item in items:
+            log_action('VOLUNTEER_BLACKLISTED', f'Blacklisted volunteer ID {item["volunteer_id"]}')
+    return _save_list_entries(VolunteerBlacklist, pin_id, items, update_columns=('reason',), after_commit=audit)
 
 @bp.route('/blacklist', methods=['POST'])
 @jwt_required()
+@idempotent
 def blacklist_volunteer():
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     data = request.get_json()
     
-    blacklist = VolunteerBlacklist(
-        pin_id=user_id,
-        volunteer_id=data['volunteer_id'],
-        reason=data.get('reason', '')
-    )
-    
-    db.session.add(blacklist)
-    db.session.commit()
-    
-    log_action('VOLUNTEER_BLACKLISTED', f'Blacklisted volunteer ID {data["volunteer_id"]}')
+    if type(data.get('volunteer_id')) is not int:
+        return jsonify({'error': 'volunteer_id must be an integer'}), 400
+    if _blacklist(user_id, [data]):
+        return jsonify({'error': 'Volunteer not found'}), 404
     
     return jsonify({'message': 'Volunteer blacklisted successfully'}), 201
 
+@bp.route('/blacklist/bulk', methods=['POST'])
+@jwt_required()
+@idempotent
+def blacklist_volunteers():
+    user_id = int(get_jwt_identity())
+    try:
+        items = parse_batch(request.get_json(), 'volunteers', 'volunteer_id')
+    except InvalidBatch as e:
+        return jsonify({'error': str(e)}), 400
+    
+    missing = _blacklist(user_id, items)
+    if missing:
+        return jsonify({'error': 'Volunteers not found', 'volunteer_ids': missing}), 404
+    
+    return jsonify({
+        'message': 'Volunteers blacklisted successfully',
+        'volunteer_ids': sorted({item['volunteer_id'] for item in items})
+    }), 201
+
 @bp.route('/blacklist/<int:volunteer_id>', methods=['DELETE'])
 @jwt_required()
 def remove_from_blacklist(volunteer_id):
@@ -58,14 +94,15 @@ def get_blacklist():
     user_id = get_jwt_identity()
     
     blacklisted = VolunteerBlacklist.query.filter_by(pin_id=user_id).all()
+    volunteers = get_loader(User).load_many(item.volunteer_id for item in blacklisted)
     
     result = []
     for item in blacklisted:
-        volunteer = User.query.get(item.volunteer_id)
+        volunteer = volunteers[item.volunteer_id]
         result.append({
             'id': item.id,
             'volunteer_id': item.volunteer_id,
-            'volunteer_name': volunteer.username,
+            'volunteer_name': volunteer.username if volunteer else None,
             'reason': item.reason,
             'created_at': item.created_at.isoformat()
         })
@@ -74,34 +111,52 @@ def get_blacklist():
 
 @bp.route('/shortlist', methods=['POST'])
 @jwt_required()
+@idempotent
 def add_to_shortlist():
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     data = request.get_json()
     
-    shortlist = VolunteerShortlist(
-        pin_id=user_id,
-        volunteer_id=data['volunteer_id']
-    )
-    
-    db.session.add(shortlist)
-    db.session.commit()
+    if type(data.get('volunteer_id')) is not int:
+        return jsonify({'error': 'volunteer_id must be an integer'}), 400
+    if _save_list_entries(VolunteerShortlist, user_id, [data]):
+        return jsonify({'error': 'Volunteer not found'}), 404
     
     return jsonify({'message': 'Volunteer added to shortlist'}), 201
 
+@bp.route('/shortlist/bulk', methods=['POST'])
+@jwt_required()
+@idempotent
+def add_to_shortlist_bulk():
+    user_id = int(get_jwt_identity())
+    try:
+        items = parse_batch(request.get_json(), 'volunteers', 'volunteer_id')
+    except InvalidBatch as e:
+        return jsonify({'error': str(e)}), 400
+    
+    missing = _save_list_entries(VolunteerShortlist, user_id, items)
+    if missing:
+        return jsonify({'error': 'Volunteers not found', 'volunteer_ids': missing}), 404
+    
+    return jsonify({
+        'message': 'Volunteers added to shortlist',
+        'volunteer_ids': sorted({item['volunteer_id'] for item in items})
+    }), 201
+
 @bp.route('/shortlist', methods=['GET'])
 @jwt_required()
 def get_shortlist():
     user_id = get_jwt_identity()
     
     shortlisted = VolunteerShortlist.query.filter_by(pin_id=user_id).all()
+    volunteers = get_loader(User).load_many(item.volunteer_id for item in shortlisted)
     
     result = []
     for item in shortlisted:
-        volunteer = User.query.get(item.volunteer_id)
+        volunteer = volunteers[item.volunteer_id]
         result.append({
             'id': item.id,
             'volunteer_id': item.volunteer_id,
-            'volunteer_name': volunteer.username,
+            'volunteer_name': volunteer.username if volunteer else None,
             'created_at': item.created_at.isoformat()
         })
     
@@ -124,12 +179,7 @@ def submit_review():
     db.session.add(review)
     
     # Update volunteer's average rating
-    volunteer_profile = UserProfile.query.filter_by(user_id=data['volunteer_id']).first()
-    if volunteer_profile:
-        all_reviews = VolunteerReview.query.filter_by(volunteer_id=data['volunteer_id']).all()
-        total_rating = sum(r.rating for r in all_reviews) + data['rating']
-        volunteer_profile.total_reviews = len(all_reviews) + 1
-        volunteer_profile.rating = total_rating / volunteer_profile.total_reviews
+    apply_review(data['volunteer_id'], data['rating'])
     
     db.session.commit()
     
@@ -141,13 +191,14 @@ def submit_review():
 @jwt_required()
 def get_volunteer_reviews(volunteer_id):
     reviews = VolunteerReview.query.filter_by(volunteer_id=volunteer_id).all()
+    pins = get_loader(User).load_many(review.pin_id for review in reviews)
     
     result = []
     for review in reviews:
-        pin = User.query.get(review.pin_id)
+        pin = pins[review.pin_id]
         result.append({
             'id': review.id,
-            'pin_name': pin.username,
+            'pin_name': pin.username if pin else None,
             'rating': review.rating,
             'comment': review.comment,
             'created_at': review.created_at.isoformat()
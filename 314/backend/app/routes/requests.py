@@ -1,11 +1,82 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, url_for, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from app import db
 from app.models.request import HelpRequest, Category
-from sqlalchemy import or_
+from app.services.events import event_bus, format_sse
+from app.services.search import search_index
+from app.services.stats import stats_cache
+from app.services.view_counter import view_counter
+from app.utils.http_cache import make_etag, is_fresh, add_validators, not_modified
+from app.utils.serializers import labeled_columns, serialize_rows
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor,
+    clamp_limit, cursor_context, encode_cursor, decode_cursor, keyset_filter, keyset_order
+)
+import queue
 
 bp = Blueprint('requests', __name__, url_prefix='/api/requests')
 
+# Columns clients may sort on: every HelpRequest column, as before keyset
+# pagination. (column, id) must be a total order, so nullable columns sort
+# through COALESCE, with NULL first in ascending order; created_at and
+# updated_at are NOT NULL since migration 0009.
+SORTABLE_COLUMNS = {
+    'created_at': HelpRequest.created_at,
+    'updated_at': HelpRequest.updated_at,
+    'completed_at': func.coalesce(HelpRequest.completed_at, datetime(1970, 1, 1)),
+    'title': HelpRequest.title,
+    'description': HelpRequest.description,
+    'location': func.coalesce(HelpRequest.location, ''),
+    'urgency': func.coalesce(HelpRequest.urgency, ''),
+    'status': func.coalesce(HelpRequest.status, ''),
+    'photo_url': func.coalesce(HelpRequest.photo_url, ''),
+    'view_count': func.coalesce(HelpRequest.view_count, 0),
+    'category_id': func.coalesce(HelpRequest.category_id, 0),
+    'requester_id': HelpRequest.requester_id,
+    'id': HelpRequest.id,
+}
+
+# Fields selectable through ?fields=, mirroring HelpRequest.to_dict(); every
+# field is returned when none are requested
+PROJECTABLE_FIELDS = {
+    'id': HelpRequest.id,
+    'requester_id': HelpRequest.requester_id,
+    'title': HelpRequest.title,
+    'description': HelpRequest.description,
+    'category': Category.name,
+    'location': HelpRequest.location,
+    'urgency': HelpRequest.urgency,
+    'status': HelpRequest.status,
+    'photo_url': HelpRequest.photo_url,
+    'view_count': HelpRequest.view_count,
+    'created_at': HelpRequest.created_at,
+    'updated_at': HelpRequest.updated_at,
+}
+
+def _search_page(query, q, after, limit, filters):
+    # The index applies the filters and returns one ranked page plus one
+    # entry to tell whether more follow; a single SQL query then loads the
+    # rows, re-checking the filters against rows changed since the index
+    # last saw them. Returns (page entries, rows by id, has_more).
+    ranked = search_index.search(q, after=after, limit=limit + 1, **filters)
+    page = ranked[:limit]
+    rows = query.filter(HelpRequest.id.in_([doc_id for _, doc_id in page])).all() if page else []
+    return page, {row._id: row for row in rows}, len(ranked) > limit
+
+def _fulltext_page(query, q, after, limit):
+    # Same contract as _search_page, answered by MySQL's FULLTEXT index in
+    # one query with the score as the keyset column
+    condition, score = search_index.fulltext_score(q)
+    query = query.add_columns(score.label('_score')).filter(condition)
+    if after:
+        query = query.filter(keyset_filter(score, HelpRequest.id, *after, True))
+    rows = query.order_by(*keyset_order(score, HelpRequest.id, True)).limit(limit + 1).all()
+    page = rows[:limit]
+    return [(row._score, row._id) for row in page], {row._id: row for row in page}, len(rows) > limit
+
 @bp.route('', methods=['GET'])
 def get_requests():
     # Query parameters for filtering
@@ -15,11 +86,36 @@ def get_requests():
     status = request.args.get('status', 'pending')
     sort_by = request.args.get('sort_by', 'created_at')
     order = request.args.get('order', 'desc')
+    cursor = request.args.get('cursor')
+    fields = request.args.get('fields')
+    q = request.args.get('q', '').strip()
+    limit = clamp_limit(
+        request.args.get('limit', type=int),
+        default=current_app.config.get('REQUESTS_PAGE_SIZE', DEFAULT_PAGE_SIZE),
+        maximum=current_app.config.get('REQUESTS_MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+    )
+    
+    if sort_by not in SORTABLE_COLUMNS:
+        return jsonify({'error': f'Cannot sort by {sort_by}'}), 400
+    sort_column = SORTABLE_COLUMNS[sort_by]
+    descending = order == 'desc'
     
-    query = HelpRequest.query
+    selected = list(PROJECTABLE_FIELDS)
+    if fields:
+        selected = [f.strip() for f in fields.split(',') if f.strip()]
+        unknown = [f for f in selected if f not in PROJECTABLE_FIELDS]
+        if unknown:
+            return jsonify({'error': f'Unknown fields: {", ".join(unknown)}'}), 400
+    # Plain columns rather than HelpRequest entities; id and the sort key are
+    # always fetched so the next cursor can be built
+    columns = labeled_columns(PROJECTABLE_FIELDS, selected)
+    columns += [HelpRequest.id.label('_id'), sort_column.label('_sort')]
+    query = db.session.query(*columns).select_from(HelpRequest)
     
+    if category or 'category' in selected:
+        query = query.outerjoin(Category, HelpRequest.category_id == Category.id)
     if category:
-        query = query.join(Category).filter(Category.name == category)
+        query = query.filter(Category.name == category)
     if location:
         query = query.filter(HelpRequest.location.ilike(f'%{location}%'))
     if urgency:
@@ -27,14 +123,57 @@ def get_requests():
     if status:
         query = query.filter(HelpRequest.status == status)
     
-    # Sorting
-    if order == 'desc':
-        query = query.order_by(getattr(HelpRequest, sort_by).desc())
+    # A cursor only resumes the query it was issued for
+    context = cursor_context(q or None, None if q else sort_by, None if q else descending,
+                             category, location, urgency, status)
+    try:
+        cursor_key = decode_cursor(cursor, None if q else sort_column, context) if cursor else None
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if q:
+        # Full-text search: results are ordered by relevance instead of
+        # sort_by. The cursor is the last (score, id) served. Scores use idf,
+        # which moves as requests are added, edited or removed, so a page
+        # fetched after such a change may repeat or skip a few results near
+        # its boundary; search pages are a best-effort walk, not a snapshot.
+        if search_index.uses_fulltext():
+            page, by_id, has_more = _fulltext_page(query, q, cursor_key, limit)
+        else:
+            filters = {'status': status or None, 'urgency': urgency or None,
+                       'category': category or None, 'location': location or None}
+            page, by_id, has_more = _search_page(query, q, cursor_key, limit, filters)
+        rows = [by_id[doc_id] for _, doc_id in page if doc_id in by_id]
+        last_key = page[-1] if page else None
     else:
-        query = query.order_by(getattr(HelpRequest, sort_by).asc())
+        if cursor_key:
+            query = query.filter(keyset_filter(sort_column, HelpRequest.id, *cursor_key, descending))
+        
+        # Sorting, with id as tie-breaker so pages never overlap
+        query = query.order_by(*keyset_order(sort_column, HelpRequest.id, descending))
+        
+        # Fetch one extra row to learn whether another page exists
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            last_key = (rows[-1]._sort, rows[-1]._id)
+    
+    next_cursor = encode_cursor(*last_key, context) if has_more else None
     
-    requests = query.all()
-    return jsonify([req.to_dict() for req in requests]), 200
+    # The body is a function of these values, so a matching If-None-Match is
+    # answered before any row is serialized
+    etag = make_etag(selected, [tuple(row) for row in rows], next_cursor)
+    if is_fresh(etag):
+        response = not_modified(etag)
+    else:
+        response = add_validators(jsonify(serialize_rows(rows, selected)), etag)
+    
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        next_url = url_for('.get_requests', **{**request.args.to_dict(), 'cursor': next_cursor})
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 @bp.route('', methods=['POST'])
 @jwt_required()
@@ -54,23 +193,80 @@ def create_request():
     
     db.session.add(help_request)
     db.session.commit()
+    stats_cache.bump(total_requests=1)
     
-    return jsonify(help_request.to_dict()), 201
+    data = help_request.to_dict()
+    event_bus.publish('request.created', data)
+    return jsonify(data), 201
+
+@bp.route('/stream', methods=['GET'])
+def stream_requests():
+    # Server-Sent Events: request.created/updated/completed/deleted and
+    # offer.created/withdrawn. A "reset" event means the client missed events
+    # and should reload its lists.
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID must be an integer'}), 400
+    
+    heartbeat = current_app.config['EVENT_HEARTBEAT']
+    
+    def generate():
+        # Subscribing here rather than in the view means a client that
+        # disconnects before the first chunk, when the server never starts
+        # the generator and so never runs its finally, leaves nothing behind
+        subscription, missed = event_bus.subscribe(last_event_id)
+        try:
+            yield 'retry: 3000\n\n'
+            if missed is None:
+                yield format_sse('reset', '{}')
+            else:
+                for event in missed:
+                    yield format_sse(event.type, event.data, event.id)
+            while not subscription.overflowed:
+                try:
+                    event = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_sse(event.type, event.data, event.id)
+            yield format_sse('reset', '{}')
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @bp.route('/<int:request_id>', methods=['GET'])
 def get_request(request_id):
-    help_request = HelpRequest.query.get_or_404(request_id)
+    help_request = HelpRequest.query.options(joinedload(HelpRequest.category)).filter_by(id=request_id).first_or_404()
+    category = help_request.category
     
-    # Increment view count
-    help_request.view_count += 1
-    db.session.commit()
+    # Buffer the view; it is written back in bulk by the view counter
+    pending_views = view_counter.increment(help_request.id)
     
-    return jsonify(help_request.to_dict()), 200
+    # Weak validator: bodies that differ only in the live view count are
+    # treated as equivalent, otherwise every view would miss. The category
+    # is part of the body, so a rename changes the validator too, and
+    # updated_at has microsecond precision (DATETIME(6) on MySQL) so edits
+    # within the same second are told apart.
+    etag = make_etag(help_request.id, help_request.updated_at, help_request.category_id,
+                     category.name if category else None)
+    if is_fresh(etag):
+        return not_modified(etag, weak=True)
+    
+    data = help_request.to_dict()
+    data['view_count'] = (help_request.view_count or 0) + pending_views
+    return add_validators(jsonify(data), etag, weak=True), 200
 
 @bp.route('/<int:request_id>', methods=['PUT'])
 @jwt_required()
 def update_request(request_id):
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     help_request = HelpRequest.query.get_or_404(request_id)
     
     if help_request.requester_id != user_id:
@@ -88,12 +284,17 @@ def update_request(request_id):
         help_request.status = data['status']
     
     db.session.commit()
-    return jsonify(help_request.to_dict()), 200
+    if 'status' in data:
+        stats_cache.invalidate()
+    
+    result = help_request.to_dict()
+    event_bus.publish('request.updated', result)
+    return jsonify(result), 200
 
 @bp.route('/<int:request_id>', methods=['DELETE'])
 @jwt_required()
 def delete_request(request_id):
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     help_request = HelpRequest.query.get_or_404(request_id)
     
     if help_request.requester_id != user_id:
@@ -101,6 +302,8 @@ def delete_request(request_id):
     
     db.session.delete(help_request)
     db.session.commit()
+    stats_cache.invalidate()
+    event_bus.publish('request.deleted', {'id': request_id})
     
     return jsonify({'message': 'Request deleted successfully'}), 200
 
@@ -108,5 +311,7 @@ def delete_request(request_id):
 @jwt_required()
 def get_my_requests():
     user_id = get_jwt_identity()
-    requests = HelpRequest.query.filter_by(requester_id=user_id).order_by(HelpRequest.created_at.desc()).all()
-    return jsonify([req.to_dict() for req in requests]), 200
+    rows = db.session.query(*labeled_columns(PROJECTABLE_FIELDS, PROJECTABLE_FIELDS)).select_from(HelpRequest).outerjoin(
+        Category, HelpRequest.category_id == Category.id
+    ).filter(HelpRequest.requester_id == user_id).order_by(HelpRequest.created_at.desc()).all()
+    return jsonify(serialize_rows(rows, PROJECTABLE_FIELDS)), 200
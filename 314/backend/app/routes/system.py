@@ -1,86 +1,115 @@
-from flask import Blueprint, request, jsonify, Response
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required
 from app import db
 from app.models.user import User
 from app.models.system import SystemLog, ScheduledReport
+from app.services.audit import audit_writer
+from app.services.events import event_bus
+from app.services.metrics import request_metrics, render_metric
+from app.services.passwords import password_hasher
+from app.services.reports import REPORT_BUILDERS, FREQUENCIES
+from app.services.view_counter import view_counter
+from app.utils.auth import roles_required, scraper_or_roles_required
+from app.utils.csv_stream import EXPORT_BATCH_SIZE, iter_csv, parse_time_range
+from app.utils.serializers import labeled_columns, serialize_rows
+from sqlalchemy import select, func
 from datetime import datetime, timedelta
+import os
 import secrets
-import csv
-from io import StringIO
 
 bp = Blueprint('system', __name__, url_prefix='/api/system')
 
-def require_admin_or_manager():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    return user and user.role in ['admin', 'manager', 'sysadmin']
+# Columns of SystemLog.to_dict(); the username comes from an outer join
+LOG_FIELDS = {
+    'id': SystemLog.id,
+    'user_id': SystemLog.user_id,
+    'username': func.coalesce(User.username, 'System'),
+    'action': SystemLog.action,
+    'details': SystemLog.details,
+    'ip_address': SystemLog.ip_address,
+    'timestamp': SystemLog.timestamp,
+}
+
+def _log_rows():
+    return db.session.query(*labeled_columns(LOG_FIELDS, LOG_FIELDS)).select_from(SystemLog).outerjoin(
+        User, SystemLog.user_id == User.id
+    )
 
 @bp.route('/logs', methods=['GET'])
-@jwt_required()
+@roles_required('admin', 'manager', 'sysadmin')
 def get_system_logs():
-    if not require_admin_or_manager():
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
     action_filter = request.args.get('action')
     
-    query = SystemLog.query
+    query = _log_rows()
     
     if action_filter:
-        query = query.filter_by(action=action_filter)
+        query = query.filter(SystemLog.action == action_filter)
     
     logs = query.order_by(SystemLog.timestamp.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
     return jsonify({
-        'logs': [log.to_dict() for log in logs.items],
+        'logs': serialize_rows(logs.items, LOG_FIELDS),
         'total': logs.total,
         'pages': logs.pages,
         'current_page': page
     }), 200
 
 @bp.route('/audit-trail/<int:user_id>', methods=['GET'])
-@jwt_required()
+@roles_required('admin', 'manager', 'sysadmin')
 def get_audit_trail(user_id):
-    if not require_admin_or_manager():
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    logs = SystemLog.query.filter_by(user_id=user_id).order_by(
+    logs = _log_rows().filter(SystemLog.user_id == user_id).order_by(
         SystemLog.timestamp.desc()
     ).limit(100).all()
     
-    return jsonify([log.to_dict() for log in logs]), 200
+    return jsonify(serialize_rows(logs, LOG_FIELDS)), 200
 
 @bp.route('/export-csv', methods=['GET'])
 @jwt_required()
 def export_audit_csv():
-    logs = SystemLog.query.order_by(SystemLog.timestamp.desc()).all()
-
-    si = StringIO()
-    writer = csv.writer(si)
-    writer.writerow(['Timestamp', 'User', 'Action', 'Details', 'IP Address'])
-
-    for log in logs:
-        writer.writerow([
-            log.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            getattr(log, 'username', None) or f"User #{log.user_id}",
-            log.action,
-            log.details or '',
-            log.ip_address or ''
-        ])
+    try:
+        start, end = parse_time_range(request.args)
+    except ValueError:
+        return jsonify({'error': 'start and end must be ISO-8601 datetimes'}), 400
+    action_filter = request.args.get('action')
+    
+    query = select(
+        SystemLog.timestamp, SystemLog.user_id, User.username, SystemLog.action,
+        SystemLog.details, SystemLog.ip_address
+    ).outerjoin(User, SystemLog.user_id == User.id).order_by(SystemLog.timestamp.desc())
+    
+    if start:
+        query = query.where(SystemLog.timestamp >= start)
+    if end:
+        query = query.where(SystemLog.timestamp < end)
+    if action_filter:
+        query = query.where(SystemLog.action == action_filter)
+    
+    def generate():
+        # yield_per streams from a server-side cursor instead of buffering every row
+        logs = db.session.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        rows = (
+            [
+                log.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                log.username or ('System' if log.user_id is None else f"User #{log.user_id}"),
+                log.action,
+                log.details or '',
+                log.ip_address or ''
+            ]
+            for log in logs
+        )
+        yield from iter_csv(['Timestamp', 'User', 'Action', 'Details', 'IP Address'], rows)
 
-    output = Response(si.getvalue(), mimetype='text/csv')
+    output = Response(stream_with_context(generate()), mimetype='text/csv')
     output.headers['Content-Disposition'] = 'attachment; filename=audit_logs.csv'
     return output
 
 @bp.route('/scheduled-reports', methods=['GET'])
-@jwt_required()
+@roles_required('admin', 'manager', 'sysadmin')
 def get_scheduled_reports():
-    if not require_admin_or_manager():
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     reports = ScheduledReport.query.all()
     
     result = []
@@ -92,19 +121,22 @@ def get_scheduled_reports():
             'frequency': report.frequency,
             'is_active': report.is_active,
             'last_run': report.last_run.isoformat() if report.last_run else None,
-            'next_run': report.next_run.isoformat() if report.next_run else None
+            'next_run': report.next_run.isoformat() if report.next_run else None,
+            'last_output': os.path.basename(report.last_output) if report.last_output else None
         })
     
     return jsonify(result), 200
 
 @bp.route('/scheduled-reports', methods=['POST'])
-@jwt_required()
+@roles_required('admin', 'manager', 'sysadmin')
 def create_scheduled_report():
-    if not require_admin_or_manager():
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     
+    if data.get('report_type') not in REPORT_BUILDERS:
+        return jsonify({'error': f'report_type must be one of {", ".join(REPORT_BUILDERS)}'}), 400
+    if data.get('frequency') not in FREQUENCIES:
+        return jsonify({'error': f'frequency must be one of {", ".join(FREQUENCIES)}'}), 400
+    
     report = ScheduledReport(
         name=data['name'],
         report_type=data['report_type'],
@@ -117,3 +149,21 @@ def create_scheduled_report():
     db.session.commit()
     
     return jsonify({'message': 'Scheduled report created successfully'}), 201
+
+@bp.route('/metrics', methods=['GET'])
+@scraper_or_roles_required('admin', 'sysadmin')
+def get_metrics():
+    # Prometheus text exposition format
+    body = request_metrics.render()
+    body += render_metric('audit_queue_depth', 'gauge', 'Audit log entries waiting to be written.',
+                          audit_writer.queue_depth())
+    body += render_metric('view_counts_pending', 'gauge', 'Buffered request views not yet flushed.',
+                          view_counter.pending_total())
+    body += render_metric('sse_subscribers', 'gauge', 'Open /api/requests/stream connections.',
+                          event_bus.subscriber_count())
+    hashing = password_hasher.metrics()
+    body += render_metric('password_hash_waiting', 'gauge', 'Password hashes waiting for a pool slot.', hashing['waiting'])
+    body += render_metric('password_hash_in_flight', 'gauge', 'Password hashes running.', hashing['in_flight'])
+    body += render_metric('password_hash_completed_total', 'counter', 'Password hashes completed.', hashing['completed'])
+    body += render_metric('password_hash_rejected_total', 'counter', 'Password hashes rejected as busy.', hashing['rejected'])
+    return Response(body, mimetype='text/plain; version=0.0.4')
@@ -1,43 +1,26 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from datetime import datetime
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import text
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
 from app import db
 from app.models.user import User
-from app.models.system import SystemLog
-import csv
-import io
+from app.services.audit import log_action
+from app.services.stats import stats_cache
+from app.utils.auth import roles_required, invalidate_user
+from app.utils.csv_stream import EXPORT_BATCH_SIZE, iter_csv, parse_time_range
 
 bp = Blueprint('user_admin', __name__, url_prefix='/api/admin/users')
 
-def require_admin():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    return user and user.role == 'admin'
-
-def log_action(action, details):
-    user_id = get_jwt_identity()
-    log = SystemLog(
-        user_id=user_id,
-        action=action,
-        details=details,
-        ip_address=request.remote_addr
-    )
-    db.session.add(log)
-    db.session.commit()
-
 @bp.route('/assign-role/<int:user_id>', methods=['PUT'])
-@jwt_required()
+@roles_required('admin')
 def assign_role(user_id):
-    if not require_admin():
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     user = User.query.get_or_404(user_id)
     old_role = user.role
     user.role = data['role']
     
     db.session.commit()
+    invalidate_user(user.id)
     
     log_action('ROLE_ASSIGNED', f'Changed user {user.username} role from {old_role} to {user.role}')
     
@@ -49,30 +32,38 @@ def assign_role(user_id):
 @bp.route('/export-csv', methods=['GET'])
 @jwt_required()
 def export_users_csv():
-    result = db.session.execute(text("SELECT id, username, email FROM users")).mappings()
-
-    # 2️⃣ Prepare CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['ID', 'Email', 'Username'])  # Header row
-
-    for row in result:
-        writer.writerow([row['id'], row['email'], row['username']])
+    try:
+        start, end = parse_time_range(request.args)
+    except ValueError:
+        return jsonify({'error': 'start and end must be ISO-8601 datetimes'}), 400
+    
+    query = select(User.id, User.email, User.username).order_by(User.id)
+    
+    if start:
+        query = query.where(User.created_at >= start)
+    if end:
+        query = query.where(User.created_at < end)
+    
+    def generate():
+        # yield_per streams from a server-side cursor instead of buffering every row
+        result = db.session.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        rows = ([row.id, row.email, row.username] for row in result)
+        yield from iter_csv(['ID', 'Email', 'Username'], rows)
 
-    # 3️⃣ Create downloadable response
-    response = Response(output.getvalue(), mimetype='text/csv')
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
     response.headers["Content-Disposition"] = "attachment; filename=users.csv"
     return response
 
 @bp.route('/deactivate/<int:user_id>', methods=['PUT'])
-@jwt_required()
+@roles_required('admin')
 def deactivate_user(user_id):
-    if not require_admin():
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     user = User.query.get_or_404(user_id)
+    was_active = user.is_active
     user.is_active = False
     db.session.commit()
+    invalidate_user(user.id)
+    if was_active:
+        stats_cache.bump(active_users=-1)
     
     log_action('USER_DEACTIVATED', f'Deactivated user {user.username}')
     
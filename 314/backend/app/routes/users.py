@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from app.models.user import User, UserProfile
+from app.services.accounts import delete_user_cascade
+from app.services.audit import log_action
+from app.services.stats import stats_cache
+from app.utils.auth import load_current_user, invalidate_user
 
 bp = Blueprint('users', __name__, url_prefix='/api/users')
 
@@ -20,14 +24,13 @@ def get_user(user_id):
 @bp.route('/<int:user_id>', methods=['PUT'])
 @jwt_required()
 def update_user(user_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get_or_404(user_id)
+    current_user = load_current_user()
     
     # Only allow users to update their own profile or admins
-    if current_user_id != user_id:
-        current_user = User.query.get(current_user_id)
-        if current_user.role != 'admin':
-            return jsonify({'error': 'Unauthorized'}), 403
+    if current_user.id != user_id and current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    user = User.query.get_or_404(user_id)
     
     data = request.get_json()
     
@@ -42,14 +45,17 @@ def update_user(user_id):
 @bp.route('/<int:user_id>', methods=['DELETE'])
 @jwt_required()
 def delete_user(user_id):
-    current_user_id = int(get_jwt_identity())  # Convert back to int
-    current_user = User.query.get(current_user_id)
+    current_user = load_current_user()
     
     if current_user.role != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
     user = User.query.get_or_404(user_id)
-    db.session.delete(user)
-    db.session.commit()
+    username = user.username
+    delete_user_cascade(user_id)
+    invalidate_user(user_id)
+    stats_cache.invalidate()
+    
+    log_action('USER_DELETED', f'Deleted user {username}')
     
     return jsonify({'message': 'User deleted successfully'}), 200
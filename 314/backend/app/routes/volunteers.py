@@ -1,43 +1,95 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models.request import VolunteerOffer, HelpRequest
+from app.models.request import VolunteerOffer, HelpRequest, Category
+from app.routes.requests import PROJECTABLE_FIELDS
+from app.services.events import event_bus
+from app.services.matching import matching_index
+from app.utils.bulk import InvalidBatch, parse_batch, missing_ids, upsert
+from app.utils.idempotency import commit_view, idempotent
+from app.utils.pagination import clamp_limit
+from app.utils.serializers import labeled_columns, serialize_rows
+from datetime import datetime
 
 bp = Blueprint('volunteers', __name__, url_prefix='/api/volunteers')
 
+# Columns of VolunteerOffer.to_dict()
+OFFER_FIELDS = {
+    'id': VolunteerOffer.id,
+    'request_id': VolunteerOffer.request_id,
+    'volunteer_id': VolunteerOffer.volunteer_id,
+    'status': VolunteerOffer.status,
+    'message': VolunteerOffer.message,
+    'created_at': VolunteerOffer.created_at,
+}
+
+def _offer_event(offer):
+    # The stream is public, so the volunteer's message is left out
+    return {key: offer[key] for key in ('id', 'request_id', 'volunteer_id', 'status')}
+
+def _save_offers(volunteer_id, items):
+    # Creates the offers, or re-opens the volunteer's existing offer on the
+    # same request with the new message, in one upsert; returns their dicts
+    request_ids = [item['request_id'] for item in items]
+    missing = missing_ids(HelpRequest.id, request_ids)
+    if missing:
+        return None, missing
+    
+    now = datetime.utcnow()
+    upsert(VolunteerOffer, [{
+        'request_id': item['request_id'],
+        'volunteer_id': volunteer_id,
+        'message': item.get('message', ''),
+        'status': 'accepted',
+        'created_at': now,
+    } for item in items], key=('request_id', 'volunteer_id'), update_columns=('status', 'message'))
+    
+    rows = db.session.query(*labeled_columns(OFFER_FIELDS, OFFER_FIELDS)).filter(
+        VolunteerOffer.volunteer_id == volunteer_id, VolunteerOffer.request_id.in_(request_ids)
+    ).order_by(VolunteerOffer.id).all()
+    offers = serialize_rows(rows, OFFER_FIELDS)
+    
+    def announce():
+        matching_index.forget_volunteers([volunteer_id])
+        for offer in offers:
+            event_bus.publish('offer.created', _offer_event(offer))
+    commit_view(announce)
+    return offers, None
+
 @bp.route('/offers', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_offer():
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     data = request.get_json()
     
-    offer = VolunteerOffer(
-        request_id=data['request_id'],
-        volunteer_id=user_id,
-        message=data.get('message', ''),
-        status='accepted'
-    )
-    
-    existing_offer = VolunteerOffer.query.filter_by(
-        request_id=offer.request_id,
-        volunteer_id=user_id
-    ).first()
-
-    if existing_offer:
-        existing_offer.status = offer.status
-        existing_offer.message = offer.message
-        saved_offer = existing_offer
-    else:
-        db.session.add(offer)
-        saved_offer = offer
+    if type(data.get('request_id')) is not int:
+        return jsonify({'error': 'request_id must be an integer'}), 400
+    
+    offers, missing = _save_offers(user_id, [data])
+    if missing:
+        return jsonify({'error': 'Request not found'}), 404
+    return jsonify(offers[0]), 201
 
-    db.session.commit()
-    return jsonify(saved_offer.to_dict()), 201
+@bp.route('/offers/bulk', methods=['POST'])
+@jwt_required()
+@idempotent
+def create_offers():
+    user_id = int(get_jwt_identity())
+    try:
+        items = parse_batch(request.get_json(), 'offers', 'request_id')
+    except InvalidBatch as e:
+        return jsonify({'error': str(e)}), 400
+    
+    offers, missing = _save_offers(user_id, items)
+    if missing:
+        return jsonify({'error': 'Requests not found', 'request_ids': missing}), 404
+    return jsonify(offers), 201
 
 @bp.route('/offers/<int:offer_id>/withdraw', methods=['PUT'])
 @jwt_required()
 def withdraw_offer(offer_id):
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     offer = VolunteerOffer.query.get_or_404(offer_id)
     
     if offer.volunteer_id != user_id:
@@ -49,11 +101,34 @@ def withdraw_offer(offer_id):
     offer.status = 'withdrawn'
     db.session.commit()
     
-    return jsonify(offer.to_dict()), 200
+    result = offer.to_dict()
+    event_bus.publish('offer.withdrawn', _offer_event(result))
+    return jsonify(result), 200
 
 @bp.route('/my-offers', methods=['GET'])
 @jwt_required()
 def get_my_offers():
     user_id = get_jwt_identity()
-    offers = VolunteerOffer.query.filter_by(volunteer_id=user_id).all()
-    return jsonify([offer.to_dict() for offer in offers]), 200
+    rows = db.session.query(*labeled_columns(OFFER_FIELDS, OFFER_FIELDS)).filter(
+        VolunteerOffer.volunteer_id == user_id
+    ).all()
+    return jsonify(serialize_rows(rows, OFFER_FIELDS)), 200
+
+@bp.route('/recommended', methods=['GET'])
+@jwt_required()
+def get_recommended():
+    user_id = int(get_jwt_identity())
+    limit = clamp_limit(request.args.get('limit', type=int), default=20, maximum=100)
+    ranked = matching_index.recommend(user_id, limit)
+    if not ranked:
+        return jsonify([]), 200
+    
+    rows = db.session.query(*labeled_columns(PROJECTABLE_FIELDS, PROJECTABLE_FIELDS)).select_from(HelpRequest).outerjoin(
+        Category, HelpRequest.category_id == Category.id
+    ).filter(HelpRequest.id.in_([request_id for _, request_id in ranked]), HelpRequest.status == 'pending').all()
+    by_id = {item['id']: item for item in serialize_rows(rows, PROJECTABLE_FIELDS)}
+    
+    # Requests the index still held but that are gone or no longer open
+    matching_index.discard(request_id for _, request_id in ranked if request_id not in by_id)
+    result = [dict(by_id[request_id], score=score) for score, request_id in ranked if request_id in by_id]
+    return jsonify(result), 200
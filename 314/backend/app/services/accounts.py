@@ -0,0 +1,125 @@
+from flask import current_app
+from sqlalchemy import delete, or_, select, update
+from app import db
+from app.models.user import (
+    User, UserProfile, PasswordResetToken, VolunteerBlacklist, VolunteerShortlist, VolunteerReview
+)
+from app.models.request import HelpRequest, VolunteerOffer
+from app.models.system import SystemLog, IdempotencyKey
+from app.services.events import event_bus
+from app.services.matching import matching_index
+from app.services.ratings import reconcile_ratings
+from app.services.search import search_index
+
+def _delete_requests(request_ids):
+    db.session.execute(delete(VolunteerOffer).where(VolunteerOffer.request_id.in_(request_ids)))
+    # Reviews outlive the request they were written for
+    db.session.execute(
+        update(VolunteerReview).where(VolunteerReview.request_id.in_(request_ids)).values(request_id=None)
+    )
+    db.session.execute(delete(HelpRequest).where(HelpRequest.id.in_(request_ids)))
+
+def _forget_requests(request_ids):
+    # Core deletes skip the ORM hooks that keep these current
+    for request_id in request_ids:
+        search_index.remove(request_id)
+        event_bus.publish('request.deleted', {'id': request_id})
+    matching_index.discard(request_ids)
+
+def _release_offers(volunteer_id):
+    # Withdraws the volunteer's open offers ahead of their deletion and puts
+    # requests they had taken on, and nobody else has, back to pending.
+    # Returns (offer events, request events) to publish after the commit.
+    offers = VolunteerOffer.query.filter(
+        VolunteerOffer.volunteer_id == volunteer_id, VolunteerOffer.status.in_(('pending', 'accepted'))
+    ).all()
+    taken = {offer.request_id for offer in offers if offer.status == 'accepted'}
+    if taken:
+        taken -= set(db.session.execute(
+            select(VolunteerOffer.request_id).where(
+                VolunteerOffer.request_id.in_(taken), VolunteerOffer.volunteer_id != volunteer_id,
+                VolunteerOffer.status == 'accepted'
+            )
+        ).scalars())
+    reopened = HelpRequest.query.filter(
+        HelpRequest.id.in_(taken), HelpRequest.status == 'accepted'
+    ).all() if taken else []
+    for offer in offers:
+        offer.status = 'withdrawn'
+    for help_request in reopened:
+        # Through the ORM so the search and matching indexes pick it up
+        help_request.status = 'pending'
+    db.session.flush()
+    return (
+        [{'id': o.id, 'request_id': o.request_id, 'volunteer_id': o.volunteer_id, 'status': o.status} for o in offers],
+        [help_request.to_dict() for help_request in reopened]
+    )
+
+def delete_user_cascade(user_id, progress=None):
+    # Deletes the user and every row that references them with set-based
+    # DELETE / UPDATE ... WHERE statements in foreign key order, rather than
+    # the ORM cascade that loads each request and offer and deletes them one
+    # at a time. The user's help requests go first, USER_DELETE_CHUNK_SIZE at
+    # a time with a commit after each chunk, so a long-lived account never
+    # holds locks on all of its rows at once; running it again after an
+    # interruption carries on where it stopped. progress(deleted) is called
+    # after each chunk. Returns the number of help requests deleted.
+    chunk_size = current_app.config['USER_DELETE_CHUNK_SIZE']
+    deleted = 0
+    while True:
+        request_ids = db.session.execute(
+            select(HelpRequest.id).where(HelpRequest.requester_id == user_id)
+            .order_by(HelpRequest.id).limit(chunk_size)
+        ).scalars().all()
+        if request_ids:
+            _delete_requests(request_ids)
+            db.session.commit()
+            deleted += len(request_ids)
+            _forget_requests(request_ids)
+            if progress is not None:
+                progress(deleted)
+        if len(request_ids) < chunk_size:
+            break
+
+    # The rest is one transaction holding the user row: inserts referencing
+    # the user wait on the lock, and requests created since the last chunk
+    # are deleted here rather than breaking the final DELETE's foreign key
+    db.session.execute(select(User.id).where(User.id == user_id).with_for_update())
+    late_ids = db.session.execute(
+        select(HelpRequest.id).where(HelpRequest.requester_id == user_id)
+    ).scalars().all()
+    if late_ids:
+        _delete_requests(late_ids)
+        deleted += len(late_ids)
+    offer_events, request_events = _release_offers(user_id)
+
+    reviewed = db.session.execute(
+        select(VolunteerReview.volunteer_id).where(VolunteerReview.pin_id == user_id).distinct()
+    ).scalars().all()
+    db.session.execute(delete(VolunteerReview).where(
+        or_(VolunteerReview.pin_id == user_id, VolunteerReview.volunteer_id == user_id)
+    ))
+    db.session.execute(delete(VolunteerOffer).where(VolunteerOffer.volunteer_id == user_id))
+    for model in (VolunteerBlacklist, VolunteerShortlist):
+        db.session.execute(delete(model).where(or_(model.pin_id == user_id, model.volunteer_id == user_id)))
+    for model in (PasswordResetToken, IdempotencyKey, UserProfile):
+        db.session.execute(delete(model).where(model.user_id == user_id))
+    # The audit trail is kept, attributed to nobody
+    db.session.execute(update(SystemLog).where(SystemLog.user_id == user_id).values(user_id=None))
+    db.session.execute(delete(User).where(User.id == user_id))
+
+    reviewed = [volunteer_id for volunteer_id in reviewed if volunteer_id != user_id]
+    if reviewed:
+        # The PIN's reviews no longer count towards these volunteers'
+        # ratings; this commits the deletion along with them
+        reconcile_ratings(reviewed)
+    else:
+        db.session.commit()
+    if late_ids:
+        _forget_requests(late_ids)
+    for payload in offer_events:
+        event_bus.publish('offer.withdrawn', payload)
+    for payload in request_events:
+        event_bus.publish('request.updated', payload)
+    matching_index.forget_volunteers([user_id])
+    return deleted
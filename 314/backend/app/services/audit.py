@@ -0,0 +1,170 @@
+import atexit
+import logging
+import queue
+import threading
+from datetime import datetime
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.system import SystemLog
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Collects SystemLog rows on a bounded in-process queue and writes them from a
+# background thread with one executemany INSERT per batch, so audited
+# requests no longer pay a second commit. When the queue is full, log()
+# waits up to AUDIT_ENQUEUE_TIMEOUT seconds and then writes the row inline
+# rather than dropping it. A batch the database rejects is retried row by row,
+# and rows that still fail (the database is down) are kept and retried every
+# AUDIT_RETRY_DELAY seconds instead of being dropped. Queued rows are drained
+# at interpreter exit.
+class AuditWriter:
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = None
+        self._retry = []
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AUDIT_ASYNC', True)
+        app.config.setdefault('AUDIT_QUEUE_SIZE', 10000)
+        app.config.setdefault('AUDIT_BATCH_SIZE', 500)
+        app.config.setdefault('AUDIT_ENQUEUE_TIMEOUT', 0.5)
+        app.config.setdefault('AUDIT_RETRY_DELAY', 5)
+        self.app = app
+        self._queue = queue.Queue(maxsize=app.config['AUDIT_QUEUE_SIZE'])
+        app.extensions['audit_writer'] = self
+        atexit.register(self.shutdown)
+
+    def log(self, user_id, action, details=None, ip_address=None):
+        row = {
+            'user_id': int(user_id) if user_id is not None else None,
+            'action': action,
+            'details': details,
+            'ip_address': ip_address,
+            'timestamp': datetime.utcnow()
+        }
+        
+        if not self.app.config['AUDIT_ASYNC']:
+            self._write(self._take_retry() + [row])
+            return
+        
+        self._ensure_worker()
+        try:
+            self._queue.put(row, timeout=self.app.config['AUDIT_ENQUEUE_TIMEOUT'])
+        except queue.Full:
+            logger.warning('Audit queue full, writing entry synchronously')
+            self._write([row])
+
+    def queue_depth(self):
+        with self._lock:
+            return self._queue.qsize() + len(self._retry)
+
+    def flush(self):
+        batch_size = self.app.config['AUDIT_BATCH_SIZE']
+        self._write(self._take_retry())
+        while True:
+            batch = self._drain(batch_size)
+            if not batch:
+                break
+            self._write(batch)
+        with self._lock:
+            if self._retry:
+                logger.error('%d audit entries could not be written', len(self._retry))
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self.app is not None:
+            self.flush()
+
+    def _drain(self, limit, first=None):
+        batch = [first] if first is not None else []
+        while len(batch) < limit:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(row)
+        return batch
+
+    def _write(self, rows):
+        if not rows:
+            return
+        try:
+            self._insert(rows)
+            return
+        except Exception:
+            logger.warning('Failed to write %d audit entries as a batch, retrying one by one',
+                           len(rows), exc_info=True)
+        failed = []
+        for row in rows:
+            try:
+                self._insert([row])
+            except IntegrityError:
+                # Typically the user was deleted in the meantime; the entry is
+                # kept attributed to nobody, as delete_user_cascade does
+                try:
+                    self._insert([dict(row, user_id=None)])
+                except Exception:
+                    failed.append(row)
+            except Exception:
+                failed.append(row)
+        if failed:
+            logger.error('Failed to write %d audit entries, retrying in %ss',
+                         len(failed), self.app.config['AUDIT_RETRY_DELAY'])
+            with self._lock:
+                self._retry.extend(failed)
+
+    def _insert(self, rows):
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(SystemLog), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _take_retry(self):
+        with self._lock:
+            rows, self._retry = self._retry, []
+        return rows
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        batch_size = self.app.config['AUDIT_BATCH_SIZE']
+        while True:
+            # With rows waiting for a retry, wake up for them even when
+            # nothing new is logged
+            try:
+                row = self._queue.get(timeout=self.app.config['AUDIT_RETRY_DELAY'] if self._retry else None)
+            except queue.Empty:
+                row = None
+            if row is _STOP:
+                return
+            batch = self._drain(batch_size, first=row) if row is not None else []
+            self._write(self._take_retry() + batch)
+
+audit_writer = AuditWriter()
+
+def log_action(action, details):
+    audit_writer.log(get_jwt_identity(), action, details, request.remote_addr)
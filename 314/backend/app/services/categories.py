@@ -0,0 +1,43 @@
+import threading
+import time
+from flask import jsonify
+from app.models.request import Category
+from app.utils.http_cache import make_etag
+
+# Process-local copy of the serialized active category list and its ETag.
+# create_category() invalidates it; CATEGORY_CACHE_TTL bounds how long other
+# workers keep serving a list that predates a new category.
+class CategoryCache:
+    def __init__(self, app=None):
+        self.app = None
+        self._entry = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CATEGORY_CACHE_TTL', 300)
+        app.config.setdefault('CATEGORY_MAX_AGE', 60)
+        self.app = app
+        app.extensions['category_cache'] = self
+
+    def get(self):
+        # Returns (body, etag)
+        with self._lock:
+            if self._entry is not None and time.monotonic() < self._expires_at:
+                return self._entry
+
+        categories = Category.query.filter_by(is_active=True).order_by(Category.id).all()
+        body = jsonify([{'id': c.id, 'name': c.name, 'description': c.description} for c in categories]).get_data()
+        entry = (body, make_etag(body))
+        with self._lock:
+            self._entry = entry
+            self._expires_at = time.monotonic() + self.app.config['CATEGORY_CACHE_TTL']
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+
+category_cache = CategoryCache()
@@ -0,0 +1,177 @@
+import atexit
+import contextlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+
+logger = logging.getLogger(__name__)
+
+Event = namedtuple('Event', 'id type data')
+
+class Subscription:
+    def __init__(self, size):
+        self.queue = queue.Queue(maxsize=size)
+        self.overflowed = False
+
+# Publish/subscribe bus behind GET /api/requests/stream. Each event gets an
+# increasing id and the last EVENT_BUFFER_SIZE events are kept so a client
+# reconnecting with Last-Event-ID is sent what it missed.
+#
+# With a single worker events go straight from publish() to subscribers. When
+# EVENT_FANOUT_DB names a SQLite file, publish() appends to it instead and
+# every worker on the host tails the file every EVENT_POLL_INTERVAL seconds,
+# so ids are shared and a client can resume against any worker.
+class EventBus:
+    def __init__(self, app=None):
+        self.app = None
+        self._buffer = deque()
+        self._subscribers = set()
+        self._next_id = 1
+        self._last_polled = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EVENT_BUFFER_SIZE', 1000)
+        app.config.setdefault('EVENT_SUBSCRIBER_QUEUE', 256)
+        app.config.setdefault('EVENT_HEARTBEAT', 15)
+        app.config.setdefault('EVENT_FANOUT_DB', None)
+        app.config.setdefault('EVENT_POLL_INTERVAL', 0.5)
+        self.app = app
+        self._buffer = deque(maxlen=app.config['EVENT_BUFFER_SIZE'])
+        app.extensions['event_bus'] = self
+        if app.config['EVENT_FANOUT_DB']:
+            self._create_fanout_table()
+        atexit.register(self.shutdown)
+
+    def publish(self, event_type, payload):
+        data = self.app.json.dumps(payload)
+        if self.app.config['EVENT_FANOUT_DB']:
+            self._append_fanout(event_type, data)
+            self._ensure_worker()
+            return
+        with self._lock:
+            event = Event(self._next_id, event_type, data)
+            self._next_id += 1
+            self._deliver(event)
+
+    def subscribe(self, last_event_id=None):
+        # Returns the subscription and the buffered events it missed; None in
+        # place of the list means the gap is too old and the client must reload
+        if self.app.config['EVENT_FANOUT_DB']:
+            self._ensure_worker()
+        subscription = Subscription(self.app.config['EVENT_SUBSCRIBER_QUEUE'])
+        with self._lock:
+            self._subscribers.add(subscription)
+            missed = [] if last_event_id is None else self._since(last_event_id)
+        return subscription, missed
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _since(self, last_event_id):
+        newest = self._buffer[-1].id if self._buffer else self._last_polled or self._next_id - 1
+        oldest = self._buffer[0].id if self._buffer else newest + 1
+        # Ids this bus never issued (e.g. from before a restart), or events
+        # already dropped from the buffer
+        if last_event_id > newest or last_event_id < oldest - 1:
+            return None
+        return [event for event in self._buffer if event.id > last_event_id]
+
+    def _deliver(self, event):
+        # Called with the lock held
+        self._buffer.append(event)
+        for subscription in self._subscribers:
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # A stalled client; it is told to reload instead of holding memory
+                subscription.overflowed = True
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.app.config['EVENT_FANOUT_DB'], timeout=5)
+        try:
+            connection.execute('PRAGMA journal_mode=WAL')
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _create_fanout_table(self):
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS events ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+        # Warm the buffer so resumes work right after this worker starts
+        with self._connect() as connection:
+            rows = connection.execute(
+                'SELECT id, type, data FROM events ORDER BY id DESC LIMIT ?', (self._buffer.maxlen,)
+            ).fetchall()
+        with self._lock:
+            for row in reversed(rows):
+                self._buffer.append(Event(*row))
+            self._last_polled = rows[0][0] if rows else 0
+
+    def _append_fanout(self, event_type, data):
+        with self._connect() as connection:
+            event_id = connection.execute(
+                'INSERT INTO events (type, data, created_at) VALUES (?, ?, ?)', (event_type, data, time.time())
+            ).lastrowid
+            # Keep the file to a few buffers' worth of events
+            if event_id % 100 == 0:
+                connection.execute('DELETE FROM events WHERE id <= ?', (event_id - 10 * self._buffer.maxlen,))
+
+    def _poll(self):
+        try:
+            with self._connect() as connection:
+                rows = connection.execute(
+                    'SELECT id, type, data FROM events WHERE id > ? ORDER BY id', (self._last_polled,)
+                ).fetchall()
+        except sqlite3.Error:
+            logger.exception('Failed to read events from %s', self.app.config['EVENT_FANOUT_DB'])
+            return
+        with self._lock:
+            for row in rows:
+                self._deliver(Event(*row))
+                self._last_polled = row[0]
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='event-fanout', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        interval = self.app.config['EVENT_POLL_INTERVAL']
+        while not self._stop.wait(interval):
+            self._poll()
+
+event_bus = EventBus()
+
+def format_sse(event_type, data, event_id=None):
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {event_type}')
+    lines.extend(f'data: {line}' for line in data.splitlines() or [''])
+    return '\n'.join(lines) + '\n\n'
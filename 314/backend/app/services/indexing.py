@@ -0,0 +1,167 @@
+import abc
+import threading
+import time
+from datetime import timedelta
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app import db
+
+def on_commit(key, callback):
+    # Changes a transaction collects in session.info[key] are handed to
+    # callback(changes) once it commits, and dropped if it rolls back
+    @event.listens_for(Session, 'after_commit')
+    def _apply(session):
+        changes = session.info.pop(key, None)
+        if changes:
+            callback(changes)
+
+    @event.listens_for(Session, 'after_soft_rollback')
+    def _discard(session, previous_transaction):
+        session.info.pop(key, None)
+
+def pending(target, key, factory=dict):
+    # The change collection of the session target belongs to, or None
+    session = Session.object_session(target)
+    return None if session is None else session.info.setdefault(key, factory())
+
+# Base for in-process indexes over the rows of one model, such as the search
+# and matching indexes over help requests. A subclass says which columns it
+# needs and how to fold a row into its state; this class keeps that state
+# current:
+#
+# - The state is built lazily by a full scan, and rebuilt every
+#   INDEX_REBUILD_INTERVAL seconds to reconcile deletes and anything the
+#   incremental refresh missed. The scan fills a fresh state without holding
+#   the lock; it is swapped in under the lock afterwards, with the commits
+#   that landed during the scan replayed on top.
+# - ORM commits in this process are applied as they happen.
+# - Every refresh_interval seconds rows with updated_at past the watermark are
+#   pulled in for other workers' writes. The watermark is moved back by
+#   INDEX_REFRESH_LAG seconds so rows committed late, with an updated_at
+#   older than rows already seen, are still picked up.
+class IncrementalIndex(abc.ABC):
+    model = None
+    session_key = None
+
+    def __init__(self):
+        self.app = None
+        self._state = None
+        self._watermark = None
+        self._refreshed_at = 0
+        self._rebuilt_at = 0
+        self._replay = None
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        on_commit(self.session_key, self.apply_changes)
+        for name in ('after_insert', 'after_update'):
+            event.listen(self.model, name, self._record_change)
+        event.listen(self.model, 'after_delete', self._record_delete)
+
+    def init_app(self, app):
+        app.config.setdefault('INDEX_REBUILD_INTERVAL', 3600)
+        app.config.setdefault('INDEX_REFRESH_LAG', 60)
+        self.app = app
+
+    # Subclass hooks
+
+    @abc.abstractmethod
+    def columns(self):
+        # Columns selected per row; the primary key and updated_at are added
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def target_values(self, target):
+        # The same values, in order, read from an ORM instance
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def new_state(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def apply(self, state, row_id, values):
+        # Folds one row into state; values is None when the row is gone
+        raise NotImplementedError
+
+    def rebuild_filter(self):
+        # Conditions limiting a full scan to the rows the index keeps
+        return ()
+
+    @abc.abstractmethod
+    def refresh_interval(self):
+        raise NotImplementedError
+
+    # Maintenance
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if self._state is not None and now - self._refreshed_at < self.refresh_interval():
+            return
+        # The first build waits for a build in progress; later refreshes let
+        # readers carry on with the current state
+        if not self._refresh_lock.acquire(blocking=self._state is None):
+            return
+        try:
+            if self._state is None or now - self._rebuilt_at >= self.app.config['INDEX_REBUILD_INTERVAL']:
+                self._rebuild()
+            elif time.monotonic() - self._refreshed_at >= self.refresh_interval():
+                self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def apply_changes(self, changes):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(changes)
+            if self._state is not None:
+                for row_id, values in changes.items():
+                    self.apply(self._state, row_id, values)
+
+    def _query(self):
+        primary_key = self.model.__mapper__.primary_key[0]
+        return select(primary_key, *self.columns(), self.model.updated_at)
+
+    def _rebuild(self):
+        with self._lock:
+            self._replay = []
+        try:
+            state = self.new_state()
+            watermark = None
+            query = self._query().where(*self.rebuild_filter()).execution_options(yield_per=5000)
+            for row in db.session.execute(query):
+                self.apply(state, row[0], tuple(row[1:-1]))
+                if row[-1] and (watermark is None or row[-1] > watermark):
+                    watermark = row[-1]
+            with self._lock:
+                for changes in self._replay:
+                    for row_id, values in changes.items():
+                        self.apply(state, row_id, values)
+                self._state = state
+                self._watermark = watermark
+        finally:
+            with self._lock:
+                self._replay = None
+        self._rebuilt_at = self._refreshed_at = time.monotonic()
+
+    def _refresh(self):
+        query = self._query()
+        if self._watermark is not None:
+            lag = timedelta(seconds=self.app.config['INDEX_REFRESH_LAG'])
+            query = query.where(self.model.updated_at >= self._watermark - lag)
+        rows = db.session.execute(query).all()
+        with self._lock:
+            for row in rows:
+                self.apply(self._state, row[0], tuple(row[1:-1]))
+                if row[-1] and (self._watermark is None or row[-1] > self._watermark):
+                    self._watermark = row[-1]
+        self._refreshed_at = time.monotonic()
+
+    def _record_change(self, mapper, connection, target):
+        changes = pending(target, self.session_key)
+        if changes is not None:
+            changes[mapper.primary_key_from_instance(target)[0]] = self.target_values(target)
+
+    def _record_delete(self, mapper, connection, target):
+        changes = pending(target, self.session_key)
+        if changes is not None:
+            changes[mapper.primary_key_from_instance(target)[0]] = None
@@ -0,0 +1,317 @@
+import heapq
+import time
+from sqlalchemy import event, select, literal, union_all, func
+from app import db
+from app.models.request import HelpRequest, VolunteerOffer
+from app.models.user import UserProfile, VolunteerBlacklist, VolunteerShortlist
+from app.services.indexing import IncrementalIndex, on_commit, pending
+
+try:
+    import numpy as np
+except ImportError:  # optional; candidates are scored in pure Python instead
+    np = None
+
+OPEN_STATUS = 'pending'
+URGENCY_WEIGHTS = {'low': 0.25, 'medium': 0.5, 'high': 0.75, 'urgent': 1.0}
+DEFAULT_WEIGHTS = {'category': 3.0, 'location': 2.0, 'urgency': 1.0, 'shortlist': 1.5}
+
+# Per-request columns of the candidate index
+COLUMNS = {
+    'id': 'int64',
+    'requester': 'int64',
+    'category': 'int32',
+    'location': 'int32',
+    'urgency': 'float32',
+    'active': 'bool',
+}
+
+def _empty_column(dtype, size):
+    if np is not None:
+        return np.zeros(size, dtype=dtype)
+    return [False if dtype == 'bool' else 0] * size
+
+def normalize_location(location):
+    return ' '.join(location.lower().split()) if location else ''
+
+# What the index needs to know about one volunteer, read with four small
+# queries and kept for MATCHING_PROFILE_TTL seconds
+class VolunteerProfile:
+    def __init__(self, affinity, locations, reliability, blacklisted_by, shortlisted_by, offered, loaded_at):
+        self.affinity = affinity  # category id -> share of completed tasks
+        self.locations = locations  # normalized places the volunteer has helped or lives
+        self.reliability = reliability  # 0.5 - 1.0 from UserProfile.rating
+        self.blacklisted_by = blacklisted_by
+        self.shortlisted_by = shortlisted_by
+        self.offered = offered
+        self.loaded_at = loaded_at
+
+def load_profile(volunteer_id):
+    history = db.session.execute(
+        select(HelpRequest.category_id, HelpRequest.location, func.count())
+        .join(VolunteerOffer, VolunteerOffer.request_id == HelpRequest.id)
+        .where(VolunteerOffer.volunteer_id == volunteer_id, VolunteerOffer.status == 'accepted',
+               HelpRequest.status == 'completed')
+        .group_by(HelpRequest.category_id, HelpRequest.location)
+    ).all()
+    completed = sum(count for _, _, count in history)
+    affinity = {}
+    for category_id, _, count in history:
+        if category_id is not None:
+            affinity[category_id] = affinity.get(category_id, 0) + count / completed
+    locations = {normalize_location(location) for _, location, _ in history} - {''}
+
+    profile = db.session.execute(
+        select(UserProfile.rating, UserProfile.total_reviews, UserProfile.address)
+        .where(UserProfile.user_id == volunteer_id)
+    ).first()
+    # Volunteers without reviews sit in the middle of the range
+    reliability = 0.75
+    if profile is not None:
+        if profile.total_reviews:
+            reliability = 0.5 + min(max(profile.rating or 0, 0), 5) / 10
+        if profile.address:
+            locations.add(normalize_location(profile.address))
+
+    pins = db.session.execute(union_all(
+        select(literal('blacklist'), VolunteerBlacklist.pin_id).where(VolunteerBlacklist.volunteer_id == volunteer_id),
+        select(literal('shortlist'), VolunteerShortlist.pin_id).where(VolunteerShortlist.volunteer_id == volunteer_id),
+    )).all()
+    offered = set(db.session.execute(
+        select(VolunteerOffer.request_id).where(VolunteerOffer.volunteer_id == volunteer_id)
+    ).scalars())
+
+    return VolunteerProfile(
+        affinity, locations, reliability,
+        {pin_id for kind, pin_id in pins if kind == 'blacklist'},
+        {pin_id for kind, pin_id in pins if kind == 'shortlist'},
+        offered, time.monotonic()
+    )
+
+# Open help requests stored column-wise in slots, with freed slots reused
+class MatchingState:
+    def __init__(self, capacity=1024):
+        self.slots = {}  # request id -> slot
+        self.free = []
+        self.size = 0
+        self.columns = {name: _empty_column(dtype, capacity) for name, dtype in COLUMNS.items()}
+        self.locations = {}  # normalized location -> code
+
+    def add(self, request_id, requester_id, category_id, location, urgency, status):
+        if status != OPEN_STATUS:
+            self.remove(request_id)
+            return
+        slot = self.slots.get(request_id)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                if self.size == len(self.columns['id']):
+                    self._grow()
+                slot = self.size
+                self.size += 1
+            self.slots[request_id] = slot
+        c = self.columns
+        c['id'][slot] = request_id
+        c['requester'][slot] = requester_id
+        c['category'][slot] = category_id or 0
+        c['location'][slot] = self._location_code(location)
+        c['urgency'][slot] = URGENCY_WEIGHTS.get(urgency, URGENCY_WEIGHTS['medium'])
+        c['active'][slot] = True
+
+    def remove(self, request_id):
+        slot = self.slots.pop(request_id, None)
+        if slot is not None:
+            self.columns['active'][slot] = False
+            self.free.append(slot)
+
+    def _grow(self):
+        capacity = len(self.columns['id'])
+        for name, dtype in COLUMNS.items():
+            grown = _empty_column(dtype, capacity * 2)
+            grown[:capacity] = self.columns[name]
+            self.columns[name] = grown
+
+    def _location_code(self, location):
+        # Locations are interned so matching compares integers; 0 is "none"
+        location = normalize_location(location)
+        if not location:
+            return 0
+        code = self.locations.get(location)
+        if code is None:
+            code = self.locations[location] = len(self.locations) + 1
+        return code
+
+# In-process candidate index of open help requests, stored column-wise so a
+# volunteer's scores over every open request are computed in one vectorized
+# pass (NumPy when installed) and the top k picked with a partial sort.
+#
+# Kept current by IncrementalIndex (see app/services/indexing.py), like the
+# search index, with MATCHING_REFRESH_INTERVAL between pulls of other
+# workers' writes. Requests deleted elsewhere are dropped at the next full
+# rebuild, and until then fail the final status check when recommended.
+#
+# score = category * share of the volunteer's completed tasks in the category
+#       + location * (request location is one the volunteer has worked in or
+#                     appears in their address)
+#       + urgency  * urgency weight * reliability from the volunteer's rating
+#       + shortlist * (the requester shortlisted the volunteer)
+# Requests from PINs who blacklisted the volunteer, the volunteer's own
+# requests and ones they already offered on are never returned.
+class MatchingIndex(IncrementalIndex):
+    model = HelpRequest
+    session_key = 'matching_index_changes'
+    profile_session_key = 'matching_profile_changes'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self._profiles = {}
+        # New offers and blacklist/shortlist edits change what a volunteer
+        # may be shown, so their cached profile is dropped on commit
+        on_commit(self.profile_session_key, self.forget_volunteers)
+        for model, names in (
+            (VolunteerOffer, ('after_insert', 'after_update')),
+            (VolunteerBlacklist, ('after_insert', 'after_delete')),
+            (VolunteerShortlist, ('after_insert', 'after_delete')),
+        ):
+            for name in names:
+                event.listen(model, name, self._record_volunteer)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MATCHING_REFRESH_INTERVAL', 30)
+        app.config.setdefault('MATCHING_PROFILE_TTL', 60)
+        app.config.setdefault('MATCHING_WEIGHTS', {})
+        super().init_app(app)
+        app.extensions['matching_index'] = self
+
+    def recommend(self, volunteer_id, limit):
+        # Returns (score, request id) pairs best first
+        self.ensure_fresh()
+        profile = self._profile(volunteer_id)
+        weights = dict(DEFAULT_WEIGHTS, **self.app.config['MATCHING_WEIGHTS'])
+        with self._lock:
+            state = self._state
+            if not state.slots:
+                return []
+            location_codes = {
+                code for location, code in state.locations.items()
+                if location in profile.locations or any(location in place for place in profile.locations)
+            }
+            excluded_requesters = profile.blacklisted_by | {volunteer_id}
+            if np is not None:
+                ranked = self._top_numpy(state, profile, weights, location_codes, excluded_requesters, limit)
+            else:
+                ranked = self._top_python(state, profile, weights, location_codes, excluded_requesters, limit)
+        return [(round(float(score), 6), int(request_id)) for score, request_id in ranked]
+
+    def discard(self, request_ids):
+        self.apply_changes({request_id: None for request_id in request_ids})
+
+    def forget_volunteers(self, volunteer_ids):
+        # Also for writes that bypass the ORM hooks, such as the bulk upserts
+        with self._lock:
+            for volunteer_id in volunteer_ids:
+                self._profiles.pop(volunteer_id, None)
+
+    def __len__(self):
+        state = self._state
+        return len(state.slots) if state is not None else 0
+
+    def _top_numpy(self, state, profile, weights, location_codes, excluded_requesters, limit):
+        c = state.columns
+        n = state.size
+        category = c['category'][:n]
+        affinity = np.zeros(int(category.max()) + 1 if n else 1, dtype=np.float32)
+        for category_id, share in profile.affinity.items():
+            if category_id < len(affinity):
+                affinity[category_id] = share
+
+        requester = c['requester'][:n]
+        scores = weights['category'] * affinity[category]
+        scores += weights['urgency'] * profile.reliability * c['urgency'][:n]
+        if location_codes:
+            scores += weights['location'] * np.isin(c['location'][:n], list(location_codes))
+        if profile.shortlisted_by:
+            scores += weights['shortlist'] * np.isin(requester, list(profile.shortlisted_by))
+
+        eligible = c['active'][:n] & ~np.isin(requester, list(excluded_requesters))
+        if profile.offered:
+            eligible &= ~np.isin(c['id'][:n], list(profile.offered))
+        candidates = np.flatnonzero(eligible)
+        if not len(candidates):
+            return []
+        k = min(limit, len(candidates))
+        candidate_scores = scores[candidates]
+        cutoff = np.partition(candidate_scores, len(candidates) - k)[len(candidates) - k]
+        # Everything above the k-th best score, then the newest of the
+        # requests tied with it so equal scores always rank the same way
+        above = candidates[candidate_scores > cutoff]
+        tied = candidates[candidate_scores == cutoff]
+        wanted = k - len(above)
+        if wanted < len(tied):
+            tied = tied[np.argpartition(-c['id'][tied], wanted - 1)[:wanted]]
+        top = np.concatenate((above, tied))
+        top = top[np.lexsort((-c['id'][top], -scores[top]))]
+        return zip(scores[top], c['id'][top])
+
+    def _top_python(self, state, profile, weights, location_codes, excluded_requesters, limit):
+        c = state.columns
+        candidates = []
+        for slot in range(state.size):
+            if not c['active'][slot] or c['requester'][slot] in excluded_requesters or c['id'][slot] in profile.offered:
+                continue
+            score = (
+                weights['category'] * profile.affinity.get(c['category'][slot], 0)
+                + weights['urgency'] * profile.reliability * c['urgency'][slot]
+                + weights['location'] * (c['location'][slot] in location_codes)
+                + weights['shortlist'] * (c['requester'][slot] in profile.shortlisted_by)
+            )
+            candidates.append((score, c['id'][slot]))
+        # Newest request first among equal scores, as with NumPy
+        return heapq.nlargest(limit, candidates)
+
+    def _profile(self, volunteer_id):
+        ttl = self.app.config['MATCHING_PROFILE_TTL']
+        with self._lock:
+            profile = self._profiles.get(volunteer_id)
+        if profile is None or time.monotonic() - profile.loaded_at >= ttl:
+            profile = load_profile(volunteer_id)
+            with self._lock:
+                if len(self._profiles) > 10000:
+                    self._profiles.clear()
+                self._profiles[volunteer_id] = profile
+        return profile
+
+    # IncrementalIndex hooks
+
+    def columns(self):
+        return (
+            HelpRequest.requester_id, HelpRequest.category_id, HelpRequest.location,
+            HelpRequest.urgency, HelpRequest.status
+        )
+
+    def target_values(self, target):
+        return (target.requester_id, target.category_id, target.location, target.urgency, target.status)
+
+    def rebuild_filter(self):
+        return (HelpRequest.status == OPEN_STATUS,)
+
+    def refresh_interval(self):
+        return self.app.config['MATCHING_REFRESH_INTERVAL']
+
+    def new_state(self):
+        return MatchingState()
+
+    def apply(self, state, request_id, values):
+        if values is None:
+            state.remove(request_id)
+        else:
+            state.add(request_id, *values)
+
+    def _record_volunteer(self, mapper, connection, target):
+        volunteers = pending(target, self.profile_session_key, set)
+        if volunteers is not None:
+            volunteers.add(target.volunteer_id)
+
+matching_index = MatchingIndex()
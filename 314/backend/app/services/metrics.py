@@ -0,0 +1,180 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+MAX_STATEMENT_LENGTH = 200
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield bound, running
+
+# Per-route request instrumentation. A sampled request records its latency,
+# how many SQL statements it issued and how long they took; the slowest
+# statements seen are kept for /api/system/metrics. METRICS_SAMPLE_RATE is the
+# fraction of requests recorded - at 0 no hooks or SQL listeners are installed.
+class RequestMetrics:
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._latency = defaultdict(lambda: _Histogram(LATENCY_BUCKETS))
+        self._statements = defaultdict(lambda: _Histogram(STATEMENT_BUCKETS))
+        self._sql_seconds = defaultdict(float)
+        self._responses = defaultdict(int)
+        self._slowest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_SAMPLE_RATE', 1.0)
+        app.config.setdefault('METRICS_SLOW_STATEMENTS', 10)
+        self.app = app
+        app.extensions['request_metrics'] = self
+        if app.config['METRICS_SAMPLE_RATE'] <= 0:
+            return
+
+        app.before_request(self._start)
+        app.after_request(self._record_status)
+        # Teardown runs after a streamed body has been fully sent, so CSV
+        # exports are timed end to end
+        app.teardown_request(self._finish)
+        # Listening on Engine covers every bind, including ones created later
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            self._render_histogram(
+                lines, 'http_request_duration_seconds', 'Request latency by route.', self._latency
+            )
+            self._render_histogram(
+                lines, 'http_request_sql_statements', 'SQL statements issued per request.', self._statements
+            )
+
+            lines.append('# HELP http_request_sql_seconds_total Time spent executing SQL by route.')
+            lines.append('# TYPE http_request_sql_seconds_total counter')
+            for (route, method), seconds in sorted(self._sql_seconds.items()):
+                lines.append(f'http_request_sql_seconds_total{_labels(route=route, method=method)} {seconds:.6f}')
+
+            lines.append('# HELP http_responses_total Responses by route and status code.')
+            lines.append('# TYPE http_responses_total counter')
+            for (route, method, status), count in sorted(self._responses.items()):
+                lines.append(f'http_responses_total{_labels(route=route, method=method, status=status)} {count}')
+
+            lines.append('# HELP sql_slowest_statement_seconds Slowest SQL statements seen since startup.')
+            lines.append('# TYPE sql_slowest_statement_seconds gauge')
+            ranked = sorted(self._slowest.items(), key=lambda item: item[1], reverse=True)
+            for (route, statement), seconds in ranked:
+                lines.append(
+                    f'sql_slowest_statement_seconds{_labels(route=route, statement=statement)} {seconds:.6f}'
+                )
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._statements.clear()
+            self._sql_seconds.clear()
+            self._responses.clear()
+            self._slowest = {}
+
+    def _start(self):
+        if random.random() < self.app.config['METRICS_SAMPLE_RATE']:
+            g._request_metrics = {'started': time.perf_counter(), 'statements': 0, 'sql_seconds': 0.0,
+                                  'slowest': None, 'status': None}
+
+    def _record_status(self, response):
+        sample = g.get('_request_metrics')
+        if sample is not None:
+            sample['status'] = response.status_code
+        return response
+
+    def _finish(self, exc):
+        sample = g.pop('_request_metrics', None)
+        if sample is None:
+            return
+        elapsed = time.perf_counter() - sample['started']
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        key = (route, request.method)
+        status = sample['status'] if exc is None else 500
+
+        with self._lock:
+            self._latency[key].observe(elapsed)
+            self._statements[key].observe(sample['statements'])
+            self._sql_seconds[key] += sample['sql_seconds']
+            self._responses[(route, request.method, status)] += 1
+            if sample['slowest'] is not None:
+                seconds, statement = sample['slowest']
+                self._keep_slowest((route, _normalize(statement)), seconds)
+
+    def _keep_slowest(self, key, seconds):
+        # Keyed by route and statement text so each appears as one series
+        if seconds <= self._slowest.get(key, 0):
+            return
+        self._slowest[key] = seconds
+        if len(self._slowest) > self.app.config['METRICS_SLOW_STATEMENTS']:
+            del self._slowest[min(self._slowest, key=self._slowest.get)]
+
+    def _render_histogram(self, lines, name, help_text, histograms):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (route, method), histogram in sorted(histograms.items()):
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{_labels(route=route, method=method, le=bound)} {count}')
+            lines.append(f'{name}_bucket{_labels(route=route, method=method, le="+Inf")} {histogram.total}')
+            lines.append(f'{name}_sum{_labels(route=route, method=method)} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{_labels(route=route, method=method)} {histogram.total}')
+
+request_metrics = RequestMetrics()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    sample = g.get('_request_metrics')
+    if sample is None:
+        return
+    elapsed = time.perf_counter() - context._metrics_started
+    sample['statements'] += 1
+    sample['sql_seconds'] += elapsed
+    if sample['slowest'] is None or elapsed > sample['slowest'][0]:
+        sample['slowest'] = (elapsed, statement)
+
+def _labels(**labels):
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+def _normalize(statement):
+    return ' '.join(statement.split())[:MAX_STATEMENT_LENGTH]
+
+def render_metric(name, metric_type, help_text, value):
+    return f'# HELP {name} {help_text}\n# TYPE {name} {metric_type}\n{name} {value}\n'
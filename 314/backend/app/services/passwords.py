@@ -0,0 +1,112 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHashingBusy(Exception):
+    pass
+
+# Runs Werkzeug password hashing in a small process pool so CPU-heavy
+# scrypt/pbkdf2 work cannot pin every request thread. At most
+# PASSWORD_HASH_MAX_PENDING hashes are queued or running; callers beyond that
+# wait up to PASSWORD_HASH_QUEUE_TIMEOUT seconds and then get a 503.
+# PASSWORD_HASH_WORKERS = 0 hashes inline in the calling thread.
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.app = None
+        self._pool = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._method_prefix = None
+        self._waiting = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt')
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 32)
+        app.config.setdefault('PASSWORD_HASH_QUEUE_TIMEOUT', 2)
+        self.app = app
+        self._slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_MAX_PENDING'])
+        app.extensions['password_hasher'] = self
+        app.register_error_handler(PasswordHashingBusy, self._busy_response)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.app.config['PASSWORD_HASH_METHOD'])
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        # Hashes look like "scrypt:32768:8:1$salt$digest"; the part before the
+        # first "$" records the method and cost parameters used
+        return pwhash.split('$', 1)[0] != self._configured_prefix()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'waiting': self._waiting,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'rejected': self._rejected
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _configured_prefix(self):
+        if self._method_prefix is None:
+            sample = generate_password_hash('', self.app.config['PASSWORD_HASH_METHOD'])
+            self._method_prefix = sample.split('$', 1)[0]
+        return self._method_prefix
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self._waiting += 1
+        acquired = self._slots.acquire(timeout=self.app.config['PASSWORD_HASH_QUEUE_TIMEOUT'])
+        with self._lock:
+            self._waiting -= 1
+            if not acquired:
+                self._rejected += 1
+                raise PasswordHashingBusy()
+            self._in_flight += 1
+        
+        try:
+            pool = self._get_pool()
+            if pool is None:
+                return fn(*args)
+            return pool.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    def _get_pool(self):
+        workers = self.app.config['PASSWORD_HASH_WORKERS']
+        if workers <= 0:
+            return None
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn, not fork: the parent runs background threads
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._pool
+
+    def _busy_response(self, error):
+        response = jsonify({'error': 'Server busy, please retry'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,43 @@
+from sqlalchemy import bindparam, func, select, update
+from app import db
+from app.models.user import UserProfile, VolunteerReview
+
+def apply_review(volunteer_id, rating):
+    # Folds one rating into the running average in a single atomic UPDATE.
+    # rating is assigned before total_reviews because MySQL evaluates SET
+    # clauses left to right against already-updated values.
+    count = func.coalesce(UserProfile.total_reviews, 0)
+    average = func.coalesce(UserProfile.rating, 0.0)
+    stmt = update(UserProfile).where(UserProfile.user_id == volunteer_id).ordered_values(
+        (UserProfile.rating, (average * count + rating) / (count + 1)),
+        (UserProfile.total_reviews, count + 1)
+    ).execution_options(synchronize_session=False)
+    db.session.execute(stmt)
+
+def reconcile_ratings(volunteer_ids=None):
+    # Recomputes profile ratings from one grouped query over reviews, for
+    # every volunteer or only the given ones
+    query = select(
+        VolunteerReview.volunteer_id,
+        func.count(VolunteerReview.id),
+        func.avg(VolunteerReview.rating)
+    ).group_by(VolunteerReview.volunteer_id)
+    reset = update(UserProfile).values(rating=0.0, total_reviews=0)
+    if volunteer_ids is not None:
+        query = query.where(VolunteerReview.volunteer_id.in_(volunteer_ids))
+        reset = reset.where(UserProfile.user_id.in_(volunteer_ids))
+    totals = db.session.execute(query).all()
+    
+    db.session.execute(reset.execution_options(synchronize_session=False))
+    if totals:
+        db.session.execute(
+            update(UserProfile.__table__)
+            .where(UserProfile.__table__.c.user_id == bindparam('volunteer_id'))
+            .values(rating=bindparam('avg_rating'), total_reviews=bindparam('review_count')),
+            [
+                {'volunteer_id': vid, 'review_count': count, 'avg_rating': float(avg)}
+                for vid, count, avg in totals
+            ]
+        )
+    db.session.commit()
+    return len(totals)
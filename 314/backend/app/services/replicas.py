@@ -0,0 +1,183 @@
+import atexit
+import logging
+import random
+import threading
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, TimestampSigner
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_PREFIX = 'replica_'
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_COOKIE = 'read_primary'
+STICKY_HEADER = 'X-Read-Primary'
+
+# Default lag probes by dialect; each returns seconds behind the primary.
+# Databases without replication metadata (SQLite, an unconfigured MySQL) are
+# treated as current, which is what a two-file local setup wants.
+def _mysql_lag(connection):
+    for statement, column in (('SHOW REPLICA STATUS', 'Seconds_Behind_Source'),
+                              ('SHOW SLAVE STATUS', 'Seconds_Behind_Master')):
+        try:
+            row = connection.execute(text(statement)).mappings().first()
+        except Exception:
+            continue
+        if row is None:
+            return 0
+        # NULL means the replication threads are stopped
+        return row[column]
+    return 0
+
+def _postgresql_lag(connection):
+    return connection.execute(text(
+        'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+        'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+    )).scalar()
+
+def _no_lag(connection):
+    connection.execute(text('SELECT 1'))
+    return 0
+
+LAG_PROBES = {
+    'mysql': _mysql_lag,
+    'mariadb': _mysql_lag,
+    'postgresql': _postgresql_lag,
+}
+
+# Sends the queries of GET/HEAD/OPTIONS requests to a read replica. Replicas are the
+# SQLALCHEMY_BINDS entries named replica_*; a background thread measures
+# each one's lag every REPLICA_LAG_CHECK_INTERVAL seconds and only replicas
+# at most REPLICA_MAX_LAG seconds behind are used. For REPLICA_STICKY_SECONDS
+# after a client's own write its reads stay on the primary so it sees it: the
+# write's response carries a token signed with SECRET_KEY, as the read_primary
+# cookie and the X-Read-Primary header, and any worker seeing it back (either
+# way) before it expires reads from the primary. Writes, flushes and
+# SELECT ... FOR UPDATE always go to the primary, as does anything outside a
+# request (CLI commands, background writers).
+class ReplicaRouter:
+    def __init__(self, app=None):
+        self.app = None
+        self._keys = []
+        self._lag = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('REPLICA_MAX_LAG', 2)
+        app.config.setdefault('REPLICA_LAG_CHECK_INTERVAL', 5)
+        app.config.setdefault('REPLICA_STICKY_SECONDS', 10)
+        app.config.setdefault('REPLICA_LAG_QUERY', None)
+        self.app = app
+        self._keys = sorted(
+            key for key in (app.config.get('SQLALCHEMY_BINDS') or {})
+            if key and key.startswith(REPLICA_BIND_PREFIX)
+        )
+        app.extensions['replica_router'] = self
+        if self._keys:
+            app.after_request(self._remember_write)
+            atexit.register(self.shutdown)
+
+    def read_engine(self, engines):
+        # The replica engine for this request, or None for the primary
+        if not self._keys or not has_request_context() or request.method not in READ_METHODS:
+            return None
+        if '_read_bind' not in g:
+            # Set first: resolving the identity may itself run a query
+            g._read_bind = None
+            g._read_bind = self._choose()
+        return engines[g._read_bind] if g._read_bind else None
+
+    def lag(self):
+        with self._lock:
+            return dict(self._lag)
+
+    def check_lag(self):
+        for key in self._keys:
+            try:
+                with self.app.app_context():
+                    engine = current_app.extensions['sqlalchemy'].engines[key]
+                    with engine.connect() as connection:
+                        lag = self._probe(engine)(connection)
+            except Exception:
+                logger.warning('Replica %s is unreachable, reading from the primary', key, exc_info=True)
+                lag = None
+            with self._lock:
+                self._lag[key] = float(lag) if lag is not None else None
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _probe(self, engine):
+        query = self.app.config['REPLICA_LAG_QUERY']
+        if query:
+            return lambda connection: connection.execute(text(query)).scalar()
+        return LAG_PROBES.get(engine.dialect.name, _no_lag)
+
+    def _choose(self):
+        self._ensure_worker()
+        if self._wants_primary():
+            return None
+        max_lag = self.app.config['REPLICA_MAX_LAG']
+        with self._lock:
+            healthy = [key for key in self._keys if self._lag.get(key) is not None and self._lag[key] <= max_lag]
+        return random.choice(healthy) if healthy else None
+
+    def _signer(self):
+        return TimestampSigner(self.app.secret_key, salt='replica-sticky')
+
+    def _wants_primary(self):
+        token = request.headers.get(STICKY_HEADER) or request.cookies.get(STICKY_COOKIE)
+        if not token or not self.app.secret_key:
+            return False
+        try:
+            self._signer().unsign(token, max_age=self.app.config['REPLICA_STICKY_SECONDS'])
+        except BadSignature:
+            # Also raised once the token has expired
+            return False
+        return True
+
+    def _remember_write(self, response):
+        if request.method in READ_METHODS or response.status_code >= 400 or not self.app.secret_key:
+            return response
+        sticky = self.app.config['REPLICA_STICKY_SECONDS']
+        token = self._signer().sign('primary').decode()
+        response.set_cookie(STICKY_COOKIE, token, max_age=sticky, httponly=True, samesite='Lax')
+        response.headers[STICKY_HEADER] = token
+        return response
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='replica-lag', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        interval = self.app.config['REPLICA_LAG_CHECK_INTERVAL']
+        while True:
+            self.check_lag()
+            if self._stop.wait(interval):
+                return
+
+replica_router = ReplicaRouter()
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not _is_write(clause):
+            engine = replica_router.read_engine(self._db.engines)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _is_write(clause):
+    if clause is None:
+        return False
+    return getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None
@@ -0,0 +1,307 @@
+import atexit
+import calendar
+import csv
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func, or_
+from app import db
+from app.models.user import User, UserProfile, VolunteerReview
+from app.models.request import HelpRequest, VolunteerOffer, Category
+from app.models.system import SystemLog, ScheduledReport
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_MONTHS = {'monthly': 1, 'quarterly': 3}
+FREQUENCY_DAYS = {'daily': 1, 'weekly': 7}
+FREQUENCIES = tuple(FREQUENCY_DAYS) + tuple(FREQUENCY_MONTHS)
+
+def _add_months(moment, months):
+    month = moment.month - 1 + months
+    year = moment.year + month // 12
+    month = month % 12 + 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+def advance_next_run(next_run, frequency, now):
+    # Steps the schedule forward until it is in the future; runs missed while
+    # the scheduler was down are not replayed one by one
+    step = lambda moment: (
+        moment + timedelta(days=FREQUENCY_DAYS[frequency]) if frequency in FREQUENCY_DAYS
+        else _add_months(moment, FREQUENCY_MONTHS[frequency])
+    )
+    moment = next_run or now
+    while moment <= now:
+        moment = step(moment)
+    return moment
+
+# Report builders. Each covers the window (start, end] - start is the previous
+# run's watermark, None on the first run - so only rows added since the last
+# run are read. Running totals are carried in the report's state and returned
+# updated alongside the CSV rows.
+
+def _in_window(column, start, end):
+    conditions = [column <= end]
+    if start is not None:
+        conditions.append(column > start)
+    return conditions
+
+def _grouped_counts(key, timestamp, start, end, prefix):
+    rows = db.session.execute(
+        select(key, func.count()).where(*_in_window(timestamp, start, end)).group_by(key)
+    ).all()
+    return {f'{prefix}:{value}': count for value, count in rows}
+
+def _count(timestamp, start, end):
+    return db.session.execute(select(func.count()).where(*_in_window(timestamp, start, end))).scalar()
+
+def _counter_rows(period, state):
+    totals = state.setdefault('totals', {})
+    for metric, value in period.items():
+        totals[metric] = totals.get(metric, 0) + value
+    rows = [['metric', 'this_period', 'all_time']]
+    rows += [[metric, period.get(metric, 0), totals[metric]] for metric in sorted(totals)]
+    return rows, state
+
+def user_activity_report(start, end, state):
+    period = {'new_users': _count(User.created_at, start, end)}
+    period.update(_grouped_counts(SystemLog.action, SystemLog.timestamp, start, end, 'action'))
+    return _counter_rows(period, state)
+
+def request_stats_report(start, end, state):
+    period = {
+        'requests_created': _count(HelpRequest.created_at, start, end),
+        'requests_completed': _count(HelpRequest.completed_at, start, end),
+        'offers_made': _count(VolunteerOffer.created_at, start, end),
+    }
+    period.update(_grouped_counts(HelpRequest.urgency, HelpRequest.created_at, start, end, 'urgency'))
+    category_rows = db.session.execute(
+        select(Category.name, func.count()).select_from(HelpRequest)
+        .outerjoin(Category, HelpRequest.category_id == Category.id)
+        .where(*_in_window(HelpRequest.created_at, start, end)).group_by(Category.name)
+    ).all()
+    period.update({f'category:{name}': count for name, count in category_rows})
+    return _counter_rows(period, state)
+
+def system_health_report(start, end, state):
+    period = {
+        'audit_entries': _count(SystemLog.timestamp, start, end),
+        'new_users': _count(User.created_at, start, end),
+        'requests_created': _count(HelpRequest.created_at, start, end),
+        'offers_made': _count(VolunteerOffer.created_at, start, end),
+        'reviews_written': _count(VolunteerReview.created_at, start, end),
+    }
+    return _counter_rows(period, state)
+
+def volunteer_performance_report(start, end, state):
+    # All-time figures come from the profile totals reconcile_ratings and
+    # apply_review keep, so nothing per volunteer is carried in state; the
+    # report lists the volunteers reviewed in the window
+    state.pop('volunteers', None)
+    rows = [['volunteer_id', 'username', 'reviews_this_period', 'avg_rating_this_period', 'reviews_all_time', 'avg_rating_all_time']]
+    period = db.session.execute(
+        select(VolunteerReview.volunteer_id, func.count(), func.sum(VolunteerReview.rating))
+        .where(*_in_window(VolunteerReview.created_at, start, end)).group_by(VolunteerReview.volunteer_id)
+    ).all()
+    if not period:
+        return rows, state
+    profiles = {
+        user_id: (username, total_reviews, rating)
+        for user_id, username, total_reviews, rating in db.session.execute(
+            select(User.id, User.username, UserProfile.total_reviews, UserProfile.rating)
+            .outerjoin(UserProfile, UserProfile.user_id == User.id)
+            .where(User.id.in_([volunteer_id for volunteer_id, _, _ in period]))
+        )
+    }
+    for volunteer_id, count, rating_sum in sorted(period, key=lambda row: (-row[1], row[0])):
+        username, total_reviews, rating = profiles.get(volunteer_id, ('', None, None))
+        rows.append([
+            volunteer_id, username,
+            count, round(int(rating_sum or 0) / count, 2),
+            total_reviews or 0, round(rating, 2) if total_reviews else ''
+        ])
+    return rows, state
+
+REPORT_BUILDERS = {
+    'user_activity': user_activity_report,
+    'request_stats': request_stats_report,
+    'volunteer_performance': volunteer_performance_report,
+    'system_health': system_health_report,
+}
+
+# Runs due ScheduledReport rows. claim_due() marks up to REPORT_BATCH_SIZE due
+# reports as leased for REPORT_LEASE_SECONDS, using SELECT ... FOR UPDATE SKIP
+# LOCKED where the database supports it and a conditional UPDATE elsewhere,
+# so several workers or hosts can poll without running a report twice. Claimed
+# reports run on a pool of REPORT_WORKERS threads and write a CSV under
+# UPLOAD_FOLDER/reports. The poller thread starts only when
+# REPORT_SCHEDULER_ENABLED is set; `flask run-reports` runs one pass from cron.
+class ReportScheduler:
+    def __init__(self, app=None):
+        self.app = None
+        self._pool = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('REPORT_SCHEDULER_ENABLED', False)
+        app.config.setdefault('REPORT_POLL_INTERVAL', 60)
+        app.config.setdefault('REPORT_WORKERS', 2)
+        app.config.setdefault('REPORT_BATCH_SIZE', 10)
+        app.config.setdefault('REPORT_LEASE_SECONDS', 600)
+        app.config.setdefault('REPORT_RETRY_DELAY', 300)
+        app.config.setdefault('REPORT_WINDOW_GRACE', 300)
+        self.app = app
+        app.extensions['report_scheduler'] = self
+        atexit.register(self.shutdown)
+        if app.config['REPORT_SCHEDULER_ENABLED']:
+            self.start()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='report-scheduler', daemon=True)
+                self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def run_pending(self):
+        # Claims and runs every due report; returns how many succeeded
+        succeeded = 0
+        while not self._stop.is_set():
+            with self.app.app_context():
+                report_ids = self.claim_due()
+            if not report_ids:
+                break
+            results = list(self._executor().map(self.run_report, report_ids))
+            succeeded += sum(results)
+        return succeeded
+
+    def claim_due(self, now=None):
+        now = now or datetime.utcnow()
+        limit = self.app.config['REPORT_BATCH_SIZE']
+        due = (
+            ScheduledReport.is_active.is_(True),
+            ScheduledReport.next_run <= now,
+            or_(ScheduledReport.claimed_until.is_(None), ScheduledReport.claimed_until < now),
+        )
+        lease = now + timedelta(seconds=self.app.config['REPORT_LEASE_SECONDS'])
+        candidates = select(ScheduledReport.id).where(*due).order_by(ScheduledReport.next_run).limit(limit)
+
+        if _supports_skip_locked(db.engine.dialect):
+            # Rows another worker is claiming are skipped rather than waited on
+            report_ids = db.session.execute(candidates.with_for_update(skip_locked=True)).scalars().all()
+            if report_ids:
+                db.session.execute(
+                    update(ScheduledReport).where(ScheduledReport.id.in_(report_ids)).values(claimed_until=lease)
+                )
+        else:
+            # Re-checking the due conditions in the UPDATE makes it a
+            # compare-and-set: a report claimed in between matches no row
+            report_ids = []
+            for report_id in db.session.execute(candidates).scalars().all():
+                result = db.session.execute(
+                    update(ScheduledReport).where(ScheduledReport.id == report_id, *due).values(claimed_until=lease)
+                )
+                if result.rowcount == 1:
+                    report_ids.append(report_id)
+        db.session.commit()
+        return report_ids
+
+    def run_report(self, report_id):
+        with self.app.app_context():
+            report = db.session.get(ScheduledReport, report_id)
+            if report is None:
+                # Deleted after it was claimed
+                return False
+            now = datetime.utcnow()
+            # The window stops REPORT_WINDOW_GRACE seconds short of now so rows
+            # whose transactions commit late, with an earlier timestamp, are
+            # still counted by the next run instead of falling behind the watermark
+            end = now - timedelta(seconds=self.app.config['REPORT_WINDOW_GRACE'])
+            if report.watermark is not None and end < report.watermark:
+                end = report.watermark
+            try:
+                builder = REPORT_BUILDERS[report.report_type]
+                state = json.loads(report.state) if report.state else {}
+                rows, state = builder(report.watermark, end, state)
+                path = self._write_csv(report, rows, now)
+            except Exception:
+                logger.exception('Scheduled report %s (%s) failed', report.id, report.report_type)
+                db.session.rollback()
+                report.claimed_until = None
+                report.next_run = now + timedelta(seconds=self.app.config['REPORT_RETRY_DELAY'])
+                db.session.commit()
+                return False
+
+            report.watermark = end
+            report.state = json.dumps(state)
+            report.last_run = now
+            report.last_output = path
+            report.next_run = advance_next_run(report.next_run, report.frequency, now)
+            report.claimed_until = None
+            db.session.commit()
+            logger.info('Scheduled report %s wrote %s', report.id, path)
+            return True
+
+    def _write_csv(self, report, rows, now):
+        folder = self.app.config['UPLOAD_FOLDER']
+        if not os.path.isabs(folder):
+            # Relative to the backend directory rather than the working directory
+            folder = os.path.join(os.path.dirname(self.app.root_path), folder)
+        directory = os.path.join(folder, 'reports', str(report.id))
+        os.makedirs(directory, exist_ok=True)
+
+        slug = re.sub(r'[^a-z0-9]+', '-', report.name.lower()).strip('-') or report.report_type
+        path = os.path.join(directory, f'{slug}_{now:%Y%m%d%H%M%S}.csv')
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(directory, f'{slug}_{now:%Y%m%d%H%M%S}_{suffix}.csv')
+        with open(path, 'w', newline='') as output:
+            csv.writer(output).writerows(rows)
+        return path
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.app.config['REPORT_WORKERS'], thread_name_prefix='report'
+                )
+            return self._pool
+
+    def _run(self):
+        interval = self.app.config['REPORT_POLL_INTERVAL']
+        while True:
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception('Report scheduler pass failed')
+            if self._stop.wait(interval):
+                return
+
+report_scheduler = ReportScheduler()
+
+def _supports_skip_locked(dialect):
+    version = dialect.server_version_info or ()
+    if dialect.name == 'mysql':
+        if getattr(dialect, 'is_mariadb', False):
+            return version >= (10, 6)
+        return version >= (8, 0, 1)
+    if dialect.name == 'mariadb':
+        return version >= (10, 6)
+    return dialect.name == 'postgresql' and version >= (9, 5)
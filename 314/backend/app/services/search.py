@@ -0,0 +1,171 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from sqlalchemy import case, select
+from sqlalchemy.dialects.mysql import match
+from app import db
+from app.models.request import HelpRequest, Category
+from app.services.indexing import IncrementalIndex
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def tokenize(text):
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+def _category_token(category_id):
+    # Documents carry their category as an id token so renaming a category
+    # never requires reindexing its requests
+    return f'\x00cat:{category_id}'
+
+class SearchState:
+    def __init__(self):
+        self.postings = defaultdict(dict)  # token -> {doc id: 1 + log(tf)}
+        self.documents = {}  # doc id -> its tokens
+        self.attributes = {}  # doc id -> (status, urgency, category id, lowercased location)
+
+    def remove(self, doc_id):
+        self.attributes.pop(doc_id, None)
+        tokens = self.documents.pop(doc_id, None)
+        if not tokens:
+            return
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[token]
+
+# In-process inverted index over help request title, description, location
+# and category name, maintained by IncrementalIndex (see app/services/indexing.py)
+# and refreshed every SEARCH_REFRESH_INTERVAL seconds. Each document also
+# carries the request's status, urgency, category and location so the
+# listing's filters are applied here and a search returns exactly one page.
+#
+# On MySQL the database's FULLTEXT index ranks and pages instead (see
+# uses_fulltext), so workers keep no copy of the corpus and a search costs
+# one indexed query however large the table grows.
+class SearchIndex(IncrementalIndex):
+    model = HelpRequest
+    session_key = 'search_index_changes'
+
+    def __init__(self, app=None):
+        super().__init__()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SEARCH_REFRESH_INTERVAL', 30)
+        app.config.setdefault('SEARCH_BACKEND', 'auto')
+        super().init_app(app)
+        app.extensions['search_index'] = self
+
+    def uses_fulltext(self):
+        backend = self.app.config['SEARCH_BACKEND']
+        if backend == 'auto':
+            return db.engine.dialect.name == 'mysql'
+        return backend == 'fulltext'
+
+    def fulltext_score(self, q):
+        # (condition, score) for ranking with ix_help_requests_fulltext. The
+        # condition is the bare MATCH so MySQL answers it from the index;
+        # requests whose category name matches a term rank higher but, unlike
+        # the in-process index, only among those whose text matches too.
+        relevance = match(HelpRequest.title, HelpRequest.description, HelpRequest.location, against=q)
+        relevance = relevance.in_natural_language_mode()
+        terms = set(tokenize(q))
+        categories = [
+            category_id for category_id, name in db.session.execute(select(Category.id, Category.name))
+            if terms.intersection(tokenize(name))
+        ]
+        if not categories:
+            return relevance, relevance
+        return relevance, relevance + case((HelpRequest.category_id.in_(categories), 1.0), else_=0.0)
+
+    def search(self, q, after=None, limit=None, status=None, urgency=None, category=None, location=None):
+        # Returns up to limit (score, id) pairs best first, ties broken by
+        # newest id; after=(score, id) resumes below a previous page. The
+        # filters match the listing's: category by name, location as a
+        # case-insensitive substring.
+        terms = set(tokenize(q))
+        if not terms:
+            return []
+        self.ensure_fresh()
+        categories = db.session.execute(select(Category.id, Category.name)).all()
+        terms |= {
+            _category_token(category_id) for category_id, name in categories
+            if terms.intersection(tokenize(name))
+        }
+        category_id = None
+        if category:
+            category_id = next((cid for cid, name in categories if name == category), None)
+            if category_id is None:
+                return []
+        location = location.lower() if location else None
+
+        def wanted(attributes):
+            doc_status, doc_urgency, doc_category_id, doc_location = attributes
+            return (
+                (status is None or doc_status == status)
+                and (urgency is None or doc_urgency == urgency)
+                and (category_id is None or doc_category_id == category_id)
+                and (location is None or location in doc_location)
+            )
+
+        with self._lock:
+            state = self._state
+            total = len(state.documents) or 1
+            scores = Counter()
+            for term in terms:
+                postings = state.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for doc_id, weight in postings.items():
+                    scores[doc_id] += weight * idf
+            attributes = state.attributes
+            entries = (
+                (round(score, 6), doc_id) for doc_id, score in scores.items()
+                if wanted(attributes[doc_id])
+            )
+            if after is not None:
+                entries = (entry for entry in entries if entry < after)
+            # A bounded heap instead of sorting every match
+            return heapq.nlargest(limit, entries) if limit is not None else sorted(entries, reverse=True)
+
+    def remove(self, doc_id):
+        self.apply_changes({doc_id: None})
+
+    # IncrementalIndex hooks
+
+    def columns(self):
+        return (
+            HelpRequest.title, HelpRequest.description, HelpRequest.location,
+            HelpRequest.category_id, HelpRequest.status, HelpRequest.urgency
+        )
+
+    def target_values(self, target):
+        return (target.title, target.description, target.location, target.category_id, target.status, target.urgency)
+
+    def refresh_interval(self):
+        return self.app.config['SEARCH_REFRESH_INTERVAL']
+
+    def new_state(self):
+        return SearchState()
+
+    def apply(self, state, doc_id, values):
+        state.remove(doc_id)
+        if values is None:
+            return
+        title, description, location, category_id, status, urgency = values
+        tokens = Counter(tokenize(title) + tokenize(description) + tokenize(location))
+        if category_id is not None:
+            tokens[_category_token(category_id)] += 1
+        state.documents[doc_id] = tuple(tokens)
+        state.attributes[doc_id] = (status, urgency, category_id, (location or '').lower())
+        for token, tf in tokens.items():
+            state.postings[token][doc_id] = 1 + math.log(tf)
+
+search_index = SearchIndex()
@@ -0,0 +1,73 @@
+import threading
+import time
+from sqlalchemy import select, func, case, true
+from app import db
+from app.models.user import User
+from app.models.request import HelpRequest
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def compute_stats():
+    # One round-trip: each table is scanned once with conditional aggregation
+    users = select(
+        func.count().label('total'),
+        _count_where(User.is_active.is_(True)).label('active')
+    ).subquery()
+    requests = select(
+        func.count().label('total'),
+        _count_where(HelpRequest.status == 'completed').label('completed')
+    ).subquery()
+    
+    row = db.session.execute(
+        select(users.c.total, users.c.active, requests.c.total, requests.c.completed)
+        .select_from(users.join(requests, true()))
+    ).one()
+    
+    return {
+        'total_users': row[0],
+        'active_users': int(row[1]),
+        'total_requests': row[2],
+        'completed_requests': int(row[3])
+    }
+
+# Process-local snapshot of the admin dashboard counters. Mutating endpoints
+# bump() the counters they change or invalidate() when the delta is unknown;
+# STATS_CACHE_TTL bounds staleness from writes made by other workers.
+class StatsCache:
+    def __init__(self, app=None):
+        self.app = None
+        self._snapshot = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('STATS_CACHE_TTL', 30)
+        self.app = app
+        app.extensions['stats_cache'] = self
+
+    def get(self):
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() < self._expires_at:
+                return dict(self._snapshot)
+        
+        snapshot = compute_stats()
+        with self._lock:
+            self._snapshot = snapshot
+            self._expires_at = time.monotonic() + self.app.config['STATS_CACHE_TTL']
+        return dict(snapshot)
+
+    def bump(self, **deltas):
+        with self._lock:
+            if self._snapshot is None:
+                return
+            for key, delta in deltas.items():
+                self._snapshot[key] += delta
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+stats_cache = StatsCache()
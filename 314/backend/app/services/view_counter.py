@@ -0,0 +1,91 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+from sqlalchemy import case, func, update
+from app import db
+from app.models.request import HelpRequest
+
+logger = logging.getLogger(__name__)
+
+# Buffers help request views in memory. Reads only bump a process-local
+# counter; a background thread adds the buffered counts to
+# help_requests.view_count with one UPDATE every VIEW_COUNT_FLUSH_INTERVAL
+# seconds, and whatever is left is flushed at interpreter exit.
+class ViewCounter:
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('VIEW_COUNT_FLUSH_INTERVAL', 10)
+        self.app = app
+        app.extensions['view_counter'] = self
+        atexit.register(self.shutdown)
+
+    def increment(self, request_id, amount=1):
+        with self._lock:
+            self._pending[request_id] += amount
+            pending = self._pending[request_id]
+        self._ensure_worker()
+        return pending
+
+    def pending(self, request_id):
+        with self._lock:
+            return self._pending.get(request_id, 0)
+
+    def pending_total(self):
+        with self._lock:
+            return sum(self._pending.values())
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, Counter()
+        
+        stmt = update(HelpRequest).where(HelpRequest.id.in_(batch.keys())).values(
+            view_count=func.coalesce(HelpRequest.view_count, 0) + case(batch, value=HelpRequest.id, else_=0),
+            # A view is not an edit: keep updated_at (and the ETags and search
+            # refresh keyed on it) from moving on every flush
+            updated_at=HelpRequest.updated_at
+        ).execution_options(synchronize_session=False)
+        
+        try:
+            with self.app.app_context():
+                db.session.execute(stmt)
+                db.session.commit()
+        except Exception:
+            logger.exception('Failed to flush %d view counts, requeueing', len(batch))
+            with self._lock:
+                self._pending.update(batch)
+            return 0
+        return len(batch)
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self.app is not None:
+            self.flush()
+
+    def _ensure_worker(self):
+        if self._thread is not None or self.app.config['VIEW_COUNT_FLUSH_INTERVAL'] <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='view-counter', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        interval = self.app.config['VIEW_COUNT_FLUSH_INTERVAL']
+        while not self._stop.wait(interval):
+            self.flush()
+
+view_counter = ViewCounter()
@@ -0,0 +1,79 @@
+import hmac
+import ipaddress
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from app.models.user import User
+from app.utils.loaders import get_loader
+
+# user id -> (role, expires_at); lets role checks skip the users lookup
+_role_cache = {}
+_role_cache_lock = threading.Lock()
+
+def load_current_user():
+    # The authenticated User, loaded at most once per request
+    if '_current_user' not in g:
+        user_id = get_jwt_identity()
+        g._current_user = get_loader(User).load(user_id) if user_id is not None else None
+    return g._current_user
+
+def current_user_role():
+    user_id = get_jwt_identity()
+    if user_id is None:
+        return None
+    user_id = int(user_id)
+    
+    now = time.monotonic()
+    with _role_cache_lock:
+        cached = _role_cache.get(user_id)
+    if cached and cached[1] > now:
+        return cached[0]
+    
+    user = load_current_user()
+    role = user.role if user else None
+    ttl = current_app.config.get('CURRENT_USER_CACHE_TTL', 0)
+    if user and ttl > 0:
+        with _role_cache_lock:
+            _role_cache[user_id] = (role, now + ttl)
+    return role
+
+def invalidate_user(user_id):
+    with _role_cache_lock:
+        _role_cache.pop(int(user_id), None)
+
+def roles_required(*roles):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            if current_user_role() not in roles:
+                return jsonify({'error': 'Unauthorized'}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _is_scraper():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    allowed = current_app.config.get('METRICS_ALLOWED_IPS') or []
+    if allowed and request.remote_addr:
+        address = ipaddress.ip_address(request.remote_addr)
+        return any(address in ipaddress.ip_network(network, strict=False) for network in allowed)
+    return False
+
+def scraper_or_roles_required(*roles):
+    # For endpoints polled by monitoring: a request bearing METRICS_TOKEN or
+    # coming from a METRICS_ALLOWED_IPS network needs no user JWT (those
+    # expire too quickly for a scraper); anyone else needs one of roles
+    def decorator(fn):
+        guarded = roles_required(*roles)(fn)
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _is_scraper():
+                return fn(*args, **kwargs)
+            return guarded(*args, **kwargs)
+        return wrapper
+    return decorator
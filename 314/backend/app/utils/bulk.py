@@ -0,0 +1,76 @@
+from flask import current_app
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app import db
+
+class InvalidBatch(ValueError):
+    pass
+
+def parse_batch(data, field, id_field):
+    # The list of objects under data[field], each carrying an integer id_field;
+    # at most BULK_MAX_ITEMS of them
+    items = data.get(field) if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise InvalidBatch(f'{field} must be a non-empty list')
+    maximum = current_app.config['BULK_MAX_ITEMS']
+    if len(items) > maximum:
+        raise InvalidBatch(f'At most {maximum} {field} per request')
+    for item in items:
+        if not isinstance(item, dict) or type(item.get(id_field)) is not int:
+            raise InvalidBatch(f'Every entry in {field} needs an integer {id_field}')
+    return items
+
+def missing_ids(column, ids):
+    ids = set(ids)
+    found = set(db.session.execute(select(column).where(column.in_(ids))).scalars())
+    return sorted(ids - found)
+
+# Inserts rows into model's table in one statement, resolving clashes on the
+# unique key instead of failing: columns in update_columns are overwritten
+# from the new row, and with none the existing row is kept as it is.
+#   MySQL / MariaDB  INSERT ... ON DUPLICATE KEY UPDATE
+#   PostgreSQL       INSERT ... ON CONFLICT (key) DO UPDATE / DO NOTHING
+#   SQLite           the same ON CONFLICT clause (3.24+)
+# Other databases fall back to a locked SELECT and per-row writes.
+def upsert(model, rows, key, update_columns=()):
+    # A key may appear once per statement; the last row for it wins
+    rows = list({tuple(row[column] for column in key): row for row in rows}.values())
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db.engine.dialect.name
+
+    if dialect in ('mysql', 'mariadb'):
+        statement = mysql.insert(table).values(rows)
+        # Assigning the key to itself is MySQL's spelling of "do nothing"
+        assignments = {column: statement.inserted[column] for column in update_columns} or {key[0]: table.c[key[0]]}
+        db.session.execute(statement.on_duplicate_key_update(assignments))
+    elif dialect in ('postgresql', 'sqlite'):
+        statement = (postgresql if dialect == 'postgresql' else sqlite).insert(table).values(rows)
+        if update_columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=list(key),
+                set_={column: statement.excluded[column] for column in update_columns}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=list(key))
+        db.session.execute(statement)
+    else:
+        _upsert_generic(model, table, rows, key, update_columns)
+
+def _upsert_generic(model, table, rows, key, update_columns):
+    key_columns = [table.c[column] for column in key]
+    existing = set(db.session.execute(
+        select(*key_columns).where(tuple_(*key_columns).in_([tuple(row[column] for column in key) for row in rows]))
+        .with_for_update()
+    ).tuples())
+    for row in rows:
+        identity = tuple(row[column] for column in key)
+        if identity not in existing:
+            db.session.execute(insert(table).values(row))
+            existing.add(identity)
+        elif update_columns:
+            db.session.execute(
+                update(table).where(*(column == value for column, value in zip(key_columns, identity)))
+                .values({column: row[column] for column in update_columns})
+            )
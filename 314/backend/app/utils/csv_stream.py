@@ -0,0 +1,24 @@
+import csv
+from datetime import datetime
+
+EXPORT_BATCH_SIZE = 1000
+
+class _Echo:
+    # File-like object whose write() hands the formatted line straight back
+    def write(self, value):
+        return value
+
+def iter_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+def parse_time_range(args):
+    # Reads optional ISO-8601 ?start= and ?end= bounds; raises ValueError on bad input
+    start = args.get('start')
+    end = args.get('end')
+    return (
+        datetime.fromisoformat(start) if start else None,
+        datetime.fromisoformat(end) if end else None
+    )
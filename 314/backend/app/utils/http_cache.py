@@ -0,0 +1,19 @@
+import hashlib
+from flask import current_app, request
+
+def make_etag(*parts):
+    # Digest of the values a representation is built from, so a validator can
+    # be checked before anything is serialized
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def is_fresh(etag):
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    return request.if_none_match.contains_weak(etag)
+
+def add_validators(response, etag, cache_control='no-cache', weak=False):
+    response.set_etag(etag, weak=weak)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def not_modified(etag, cache_control='no-cache', weak=False):
+    return add_validators(current_app.response_class(status=304), etag, cache_control, weak)
@@ -0,0 +1,105 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.system import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+def _fingerprint():
+    digest = hashlib.sha256()
+    for part in (request.method, request.path, request.get_data()):
+        digest.update(part if isinstance(part, bytes) else part.encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def _replay(record):
+    response = current_app.response_class(record.response_body, status=record.status_code, mimetype=record.mimetype)
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+# Lets clients retry a POST safely by sending an Idempotency-Key header. The
+# first request with a key inserts an IdempotencyKey row, runs the view and
+# stores its response on that row, all in one transaction: the view leaves
+# its writes to commit_view() instead of committing, so the business write
+# and the stored response commit together or not at all. A concurrent request
+# with the same key blocks on the row's unique index until then and replays
+# the stored response; a retry with the same key and body gets it back without
+# running the view again. Keys are scoped to the user and expire after
+# IDEMPOTENCY_KEY_TTL seconds; a view failing with a 5xx rolls back and
+# leaves no key. Requests without the header are unaffected. Goes under
+# @jwt_required().
+def idempotent(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return fn(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'error': 'Idempotency-Key must be at most 255 characters'}), 400
+
+        user_id = int(get_jwt_identity())
+        fingerprint = _fingerprint()
+        ttl = timedelta(seconds=current_app.config['IDEMPOTENCY_KEY_TTL'])
+
+        record = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+        if record is not None and record.created_at < datetime.utcnow() - ttl:
+            db.session.delete(record)
+            db.session.commit()
+            record = None
+        if record is None:
+            db.session.add(IdempotencyKey(user_id=user_id, key=key, fingerprint=fingerprint))
+            try:
+                db.session.flush()
+            except IntegrityError:
+                # A concurrent request with this key committed first
+                db.session.rollback()
+                record = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+            else:
+                return _run(user_id, key, fn, args, kwargs)
+
+        if record is None or record.fingerprint != fingerprint:
+            return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+        if record.status_code is None:
+            # Only keys stored before responses were saved with the write
+            return jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409
+        return _replay(record)
+    return wrapper
+
+def commit_view(*after_commit):
+    # Commits a view's writes and then calls after_commit (events, cache
+    # invalidation). Under @idempotent the commit, and so the callbacks, wait
+    # for the decorator, which commits the writes with the stored response.
+    callbacks = g.get('_idempotent_callbacks')
+    if callbacks is not None:
+        callbacks.extend(after_commit)
+        return
+    db.session.commit()
+    for callback in after_commit:
+        callback()
+
+def _run(user_id, key, fn, args, kwargs):
+    g._idempotent_callbacks = []
+    try:
+        response = current_app.make_response(fn(*args, **kwargs))
+        if response.status_code >= 500:
+            db.session.rollback()
+            return response
+        IdempotencyKey.query.filter_by(user_id=user_id, key=key).update({
+            'status_code': response.status_code,
+            'response_body': response.get_data(as_text=True),
+            'mimetype': response.mimetype,
+        })
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        callbacks = g.pop('_idempotent_callbacks')
+    for callback in callbacks:
+        callback()
+    return response
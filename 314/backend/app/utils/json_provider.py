@@ -0,0 +1,55 @@
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+def _default(o):
+    # Dates go out as ISO 8601, the same format the models' to_dict() use
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+# Encodes with orjson, which serializes datetimes natively and writes bytes
+# straight into the response. Output matches StdlibJSONProvider: sorted keys,
+# compact unless debugging, ISO 8601 dates.
+class OrjsonJSONProvider(StdlibJSONProvider):
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _options(self):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+def init_json_provider(app):
+    # JSON_PROVIDER: 'auto' uses orjson when it is installed, 'orjson'
+    # requires it, 'stdlib' always uses the json module
+    app.config.setdefault('JSON_PROVIDER', 'auto')
+    choice = app.config['JSON_PROVIDER']
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_PROVIDER is "orjson" but orjson is not installed')
+    if choice in ('auto', 'orjson') and orjson is not None:
+        app.json = OrjsonJSONProvider(app)
+    else:
+        app.json = StdlibJSONProvider(app)
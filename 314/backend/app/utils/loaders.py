@@ -0,0 +1,36 @@
+from flask import g
+
+class BatchLoader:
+    # Loads rows of one model by primary key with a single IN (...) query per
+    # batch and remembers them, so repeated lookups within a request are free.
+    def __init__(self, model):
+        self.model = model
+        self._cache = {}
+
+    def load_many(self, ids):
+        ids = {int(i) for i in ids if i is not None}
+        missing = ids - self._cache.keys()
+        if missing:
+            pk = self.model.__mapper__.primary_key[0]
+            for obj in self.model.query.filter(pk.in_(missing)):
+                self._cache[obj.id] = obj
+            # Remember misses too so they are not queried again
+            for i in missing - self._cache.keys():
+                self._cache[i] = None
+        return {i: self._cache[i] for i in ids}
+
+    def load(self, id):
+        if id is None:
+            return None
+        return self.load_many([id])[int(id)]
+
+    def prime(self, objs):
+        for obj in objs:
+            self._cache[obj.id] = obj
+
+def get_loader(model):
+    # One loader per model for the lifetime of the current request
+    loaders = g.setdefault('_batch_loaders', {})
+    if model not in loaders:
+        loaders[model] = BatchLoader(model)
+    return loaders[model]
@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidCursor(ValueError):
+    pass
+
+def clamp_limit(limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if limit is None or limit < 1:
+        return default
+    return min(limit, maximum)
+
+def cursor_context(*parts):
+    # Short digest of the query a cursor was issued for (sort, order,
+    # filters), so replaying it against a different query is rejected
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:16]
+
+def encode_cursor(sort_value, row_id, context=None):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id, context], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, sort_column=None, context=None):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id, issued_for = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is not None and sort_column is not None and sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        row_id = int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if issued_for != context:
+        raise InvalidCursor('Cursor was issued for a different sort order or filters')
+    return sort_value, row_id
+
+def keyset_filter(sort_column, id_column, cursor_value, cursor_id, descending=True):
+    # Rows strictly after (cursor_value, cursor_id) in (sort_column, id_column) order
+    if descending:
+        return or_(
+            sort_column < cursor_value,
+            and_(sort_column == cursor_value, id_column < cursor_id)
+        )
+    return or_(
+        sort_column > cursor_value,
+        and_(sort_column == cursor_value, id_column > cursor_id)
+    )
+
+def keyset_order(sort_column, id_column, descending=True):
+    if descending:
+        return sort_column.desc(), id_column.desc()
+    return sort_column.asc(), id_column.asc()
@@ -0,0 +1,11 @@
+# Read-only listings select plain columns and turn the Core rows straight into
+# dicts, skipping ORM entity construction and to_dict(). Values such as
+# datetimes are left for the app's JSON provider to encode.
+
+def labeled_columns(columns, fields):
+    # columns maps field name -> column expression
+    return [columns[field].label(field) for field in fields]
+
+def serialize_rows(rows, fields):
+    # Extra trailing columns (cursor keys and the like) are ignored
+    return [dict(zip(fields, row)) for row in rows]
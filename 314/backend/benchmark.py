@@ -0,0 +1,332 @@
+"""Benchmark every API route against a seeded database.
+
+Each route is driven through the Flask test client and measured for wall
+time, SQL statement count and rows fetched; the run fails when a route
+exceeds its budget, which catches N+1 queries and full-table reads before
+they ship.
+
+    python benchmark.py                       # fresh SQLite database, --scale 20000
+    python benchmark.py --scale 100000 --repeat 10
+    python benchmark.py --database-url mysql://user:pw@127.0.0.1/bench_db
+
+The target database is dropped and re-seeded, so never point it at real data.
+"""
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, insert
+
+load_dotenv()
+
+from config import Config
+from app import create_app, db
+from app.models.user import User
+from app.models.request import HelpRequest, VolunteerOffer
+from app.models.system import SystemLog
+import init_db
+
+class Route:
+    def __init__(self, method, path, role, body=None, setup=None, status=200,
+                 statements=None, ms=None, rows=None):
+        self.method = method
+        self.path = path
+        self.role = role
+        self.body = body
+        self.setup = setup
+        self.status = status
+        self.budget = {'statements': statements, 'ms': ms, 'rows': rows}
+
+def _new_request(ctx):
+    result = db.session.execute(insert(HelpRequest).values(
+        requester_id=ctx['pin_id'], title='Benchmark request', description='Created by benchmark.py',
+        category_id=ctx['category_id'], urgency='medium', status='pending',
+        view_count=0, created_at=datetime.utcnow(), updated_at=datetime.utcnow()
+    ))
+    db.session.commit()
+    return {'new_request_id': result.inserted_primary_key[0]}
+
+def _accepted_offer(ctx):
+    request_id = _new_request(ctx)['new_request_id']
+    result = db.session.execute(insert(VolunteerOffer).values(
+        request_id=request_id, volunteer_id=ctx['csr_id'], status='accepted', created_at=datetime.utcnow()
+    ))
+    db.session.commit()
+    return {'offer_id': result.inserted_primary_key[0]}
+
+def _new_user(ctx):
+    n = next(ctx['counter'])
+    user = User(email=f'bench-delete{n}@load.test', username=f'bench-delete{n}', role='pin')
+    user.password_hash = ctx['password_hash']
+    db.session.add(user)
+    db.session.commit()
+    return {'new_user_id': user.id}
+
+def _new_user_with_requests(ctx):
+    # A long-lived account: 200 help requests with an offer on each
+    user_id = _new_user(ctx)['new_user_id']
+    now = datetime.utcnow()
+    first = db.session.execute(insert(HelpRequest).values([{
+        'requester_id': user_id, 'title': 'Bench', 'description': 'Bench', 'category_id': ctx['category_id'],
+        'status': 'pending', 'created_at': now, 'updated_at': now,
+    } for _ in range(200)]).returning(HelpRequest.id)).scalars().all()
+    db.session.execute(insert(VolunteerOffer).values([{
+        'request_id': request_id, 'volunteer_id': ctx['csr_id'], 'status': 'accepted', 'created_at': now,
+    } for request_id in first]))
+    db.session.commit()
+    return {'new_user_id': user_id}
+
+def _reset_token(ctx):
+    from app.models.user import PasswordResetToken
+    token = PasswordResetToken.issue(ctx['pin_id'])
+    db.session.commit()
+    return {'reset_token': token}
+
+def _unique_user(ctx):
+    n = next(ctx['counter'])
+    return {'email': f'bench{n}@load.test', 'username': f'bench{n}', 'password': 'password123'}
+
+# Budgets are deliberately loose on time (CI machines vary) and tight on
+# statements and rows, which only move when a query pattern changes.
+ROUTES = [
+    # auth / password recovery
+    Route('POST', '/api/auth/register', None, body=_unique_user, status=201, statements=5, ms=2000),
+    Route('POST', '/api/auth/login', None, body={'email': 'john@mockfyp.com', 'password': 'password123'},
+          statements=1, ms=2000, rows=1),
+    Route('GET', '/api/auth/me', 'pin', statements=1, ms=50, rows=1),
+    Route('POST', '/api/auth/forgot-password', None, body={'email': 'john@mockfyp.com'},
+          statements=2, ms=100, rows=1),
+    Route('POST', '/api/auth/reset-password', None, setup=_reset_token,
+          body=lambda ctx: {'token': ctx['reset_token'], 'password': 'password123'}, statements=5, ms=2000, rows=2),
+    # requests
+    Route('GET', '/api/requests', None, statements=1, ms=200, rows=51),
+    Route('GET', '/api/requests?limit=200&fields=id,title,category,created_at', None, statements=1, ms=200, rows=201),
+    # A 1,000-row page (REQUESTS_MAX_PAGE_SIZE is raised for the benchmark)
+    # still loads every row and its category in one statement
+    Route('GET', '/api/requests?limit=1000', None, statements=1, ms=1000, rows=1001),
+    Route('GET', '/api/requests?urgency=high&category=Groceries', None, statements=1, ms=200, rows=51),
+    Route('GET', '/api/requests?q=garden+dog', None, statements=3, ms=2000, rows=500),
+    Route('GET', '/api/requests/{request_id}', None, statements=1, ms=50, rows=1),
+    Route('GET', '/api/requests/my-requests', 'pin', statements=1, ms=200),
+    Route('POST', '/api/requests', 'pin', body=lambda ctx: {'title': 'Bench', 'description': 'Bench', 'category_id': ctx['category_id']},
+          status=201, statements=4, ms=100),
+    Route('PUT', '/api/requests/{request_id}', 'pin', body={'urgency': 'high'}, statements=3, ms=100, rows=3),
+    Route('DELETE', '/api/requests/{new_request_id}', 'pin', setup=_new_request, statements=6, ms=100),
+    # volunteers
+    Route('POST', '/api/volunteers/offers', 'csr', body=lambda ctx: {'request_id': ctx['request_id']},
+          status=201, statements=3, ms=100, rows=2),
+    Route('POST', '/api/volunteers/offers/bulk', 'csr',
+          body=lambda ctx: {'offers': [{'request_id': request_id} for request_id in ctx['batch_request_ids']]},
+          status=201, statements=3, ms=200, rows=40),
+    Route('PUT', '/api/volunteers/offers/{offer_id}/withdraw', 'csr', setup=_accepted_offer, status=400,
+          statements=1, ms=50, rows=1),
+    Route('GET', '/api/volunteers/my-offers', 'csr', statements=1, ms=500),
+    Route('GET', '/api/volunteers/recommended', 'csr', statements=6, ms=500),
+    # pin
+    Route('POST', '/api/pin/blacklist', 'pin', body=lambda ctx: {'volunteer_id': ctx['csr_id'], 'reason': 'bench'},
+          status=201, statements=2, ms=100, rows=1),
+    Route('POST', '/api/pin/blacklist/bulk', 'pin',
+          body=lambda ctx: {'volunteers': [{'volunteer_id': volunteer_id} for volunteer_id in ctx['batch_volunteer_ids']]},
+          status=201, statements=2, ms=200, rows=20),
+    Route('GET', '/api/pin/blacklist', 'pin', statements=2, ms=500),
+    Route('DELETE', '/api/pin/blacklist/{csr_id}', 'pin', setup=lambda ctx: _blacklist(ctx), statements=3, ms=100, rows=1),
+    Route('POST', '/api/pin/shortlist', 'pin', body=lambda ctx: {'volunteer_id': ctx['csr_id']},
+          status=201, statements=2, ms=100, rows=1),
+    Route('POST', '/api/pin/shortlist/bulk', 'pin',
+          body=lambda ctx: {'volunteers': [{'volunteer_id': volunteer_id} for volunteer_id in ctx['batch_volunteer_ids']]},
+          status=201, statements=2, ms=200, rows=20),
+    Route('GET', '/api/pin/shortlist', 'pin', statements=2, ms=500),
+    Route('POST', '/api/pin/review', 'pin', body=lambda ctx: {'volunteer_id': ctx['csr_id'], 'request_id': ctx['request_id'], 'rating': 5},
+          status=201, statements=2, ms=100),
+    Route('GET', '/api/pin/reviews/{csr_id}', 'pin', statements=2, ms=500),
+    # csr
+    Route('GET', '/api/csr/accepted-tasks', 'csr', statements=2, ms=500),
+    Route('PUT', '/api/csr/complete-task/{offer_id}', 'csr', setup=_accepted_offer, statements=6, ms=100, rows=4),
+    # admin
+    Route('GET', '/api/admin/categories', None, statements=1, ms=50, rows=20),
+    Route('POST', '/api/admin/categories', 'admin', body=lambda ctx: {'name': f'Bench {next(ctx["counter"])}'},
+          status=201, statements=2, ms=100),
+    Route('GET', '/api/admin/stats', 'admin', statements=1, ms=2000, rows=1),
+    # system
+    Route('GET', '/api/system/logs', 'admin', statements=3, ms=500, rows=52),
+    Route('GET', '/api/system/logs?action=USER_DEACTIVATED', 'admin', statements=3, ms=500, rows=52),
+    Route('GET', '/api/system/audit-trail/{admin_id}', 'admin', statements=2, ms=200, rows=101),
+    Route('GET', '/api/system/export-csv?action=ROLE_ASSIGNED', 'admin', statements=2, ms=10000),
+    Route('GET', '/api/system/scheduled-reports', 'admin', statements=2, ms=100),
+    Route('POST', '/api/system/scheduled-reports', 'admin',
+          body={'name': 'Bench', 'report_type': 'user_activity', 'frequency': 'daily'}, status=201, statements=2, ms=100),
+    # user admin
+    Route('PUT', '/api/admin/users/assign-role/{target_user_id}', 'admin', body={'role': 'pin'}, statements=3, ms=100, rows=2),
+    Route('PUT', '/api/admin/users/deactivate/{target_user_id}', 'admin', statements=3, ms=100, rows=2),
+    Route('GET', '/api/admin/users/export-csv', 'admin', statements=1, ms=10000),
+    # users
+    Route('GET', '/api/users/{csr_id}', 'pin', statements=1, ms=50, rows=1),
+    Route('PUT', '/api/users/{pin_id}', 'pin', body={'username': 'john_doe'}, statements=2, ms=100, rows=2),
+    # Set-based: three more statements per USER_DELETE_CHUNK_SIZE help
+    # requests, however many offers and reviews hang off them
+    Route('DELETE', '/api/users/{new_user_id}', 'admin', setup=_new_user, statements=16, ms=500),
+    Route('DELETE', '/api/users/{new_user_id}', 'admin', setup=_new_user_with_requests, statements=19, ms=500),
+]
+
+def _blacklist(ctx):
+    from app.models.user import VolunteerBlacklist
+    from app.utils.bulk import upsert
+    upsert(VolunteerBlacklist, [{'pin_id': ctx['pin_id'], 'volunteer_id': ctx['csr_id']}], key=('pin_id', 'volunteer_id'))
+    db.session.commit()
+    return {}
+
+def make_config(database_url):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SECRET_KEY = Config.SECRET_KEY or 'benchmark-secret'
+        JWT_SECRET_KEY = Config.JWT_SECRET_KEY or 'benchmark-jwt-secret-key-of-sufficient-length'
+        VIEW_COUNT_FLUSH_INTERVAL = 0
+        REQUESTS_MAX_PAGE_SIZE = 1000
+    return BenchmarkConfig
+
+def seed(app, scale, seed_value):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        init_db.seed_demo_data()
+        init_db.generate_synthetic_data(scale, seed_value, batch_size=5000)
+
+def build_context(app):
+    with app.app_context():
+        admin = User.query.filter_by(email='admin@mockfyp.com').one()
+        pin = User.query.filter_by(email='john@mockfyp.com').one()
+        csr = User.query.filter_by(email='volunteer@company.com').one()
+        target = User.query.filter(User.email.like('%@load.test')).first() or csr
+        request_id = HelpRequest.query.filter_by(requester_id=pin.id).first().id
+        batch = 20
+        ctx = {
+            'admin_id': admin.id, 'pin_id': pin.id, 'csr_id': csr.id, 'target_user_id': target.id,
+            'request_id': request_id, 'category_id': HelpRequest.query.get(request_id).category_id,
+            'password_hash': pin.password_hash, 'counter': itertools.count(1),
+            'batch_request_ids': [row.id for row in HelpRequest.query.order_by(HelpRequest.id.desc()).limit(batch)],
+            'batch_volunteer_ids': [row.id for row in User.query.filter_by(role='csr').order_by(User.id.desc()).limit(batch)],
+            'tokens': {
+                role: create_access_token(identity=str(user.id))
+                for role, user in [('admin', admin), ('pin', pin), ('csr', csr)]
+            }
+        }
+    return ctx
+
+class QueryRecorder:
+    # Records statements issued by the request thread only, so background
+    # writers (audit log, view counts) do not skew a route's numbers
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.thread_id = None
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self.thread_id:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self.statements = []
+        self.thread_id = threading.get_ident()
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+def rows_fetched(engine, statements):
+    # Re-counts each SELECT's result outside the timed section
+    total = 0
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            if statement.lstrip().upper().startswith('SELECT'):
+                total += connection.exec_driver_sql(
+                    f'SELECT COUNT(*) FROM ({statement}) AS benchmark_rows', parameters
+                ).scalar()
+    return total
+
+def run_route(app, client, engine, route, ctx, repeat):
+    timings, statement_counts = [], []
+    rows = 0
+    status = None
+    for iteration in range(repeat + 1):
+        extra = {}
+        if route.setup:
+            with app.app_context():
+                extra = route.setup(ctx)
+        values = {**ctx, **extra}
+        body = route.body(values) if callable(route.body) else route.body
+        headers = {'Authorization': f'Bearer {ctx["tokens"][route.role]}'} if route.role else {}
+
+        with QueryRecorder(engine) as recorder:
+            started = time.perf_counter()
+            response = client.open(route.path.format(**values), method=route.method, json=body, headers=headers)
+            response.get_data()
+            elapsed = (time.perf_counter() - started) * 1000
+
+        status = response.status_code
+        # The first pass warms caches (role cache, search index) and is not scored
+        if iteration == 0:
+            continue
+        timings.append(elapsed)
+        statement_counts.append(len(recorder.statements))
+        with app.app_context():
+            rows = max(rows, rows_fetched(engine, recorder.statements))
+
+    return {
+        'status': status,
+        'ms': statistics.median(timings),
+        'statements': max(statement_counts),
+        'rows': rows
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every API route against a seeded database.')
+    parser.add_argument('--database-url', help='database to drop and seed (default: a temporary SQLite file)')
+    parser.add_argument('--scale', type=int, default=20000, help='synthetic users to seed (see init_db.py)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per route; the median is reported')
+    args = parser.parse_args()
+
+    tmpdir = None
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix='benchmark-')
+        database_url = f'sqlite:///{os.path.join(tmpdir, "benchmark.db")}'
+
+    app = create_app(make_config(database_url))
+    print(f'Seeding {database_url} (scale={args.scale:,})...')
+    seed(app, args.scale, args.seed)
+    ctx = build_context(app)
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+
+    failures = 0
+    print(f'\n{"route":<62} {"status":>6} {"ms":>9} {"stmts":>6} {"rows":>8}')
+    for route in ROUTES:
+        result = run_route(app, client, engine, route, ctx, args.repeat)
+        problems = []
+        if result['status'] != route.status:
+            problems.append(f'status {result["status"]} != {route.status}')
+        for key, limit in route.budget.items():
+            if limit is not None and result[key] > limit:
+                problems.append(f'{key} {result[key]:.0f} > {limit}')
+        if problems:
+            failures += 1
+
+        name = f'{route.method} {route.path}'
+        print(f'{name:<62} {result["status"]:>6} {result["ms"]:>9.1f} {result["statements"]:>6} {result["rows"]:>8}'
+              + (f'  OVER BUDGET: {", ".join(problems)}' if problems else ''))
+
+    print(f'\n{failures} of {len(ROUTES)} routes over budget')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,8 +11,19 @@ class Config:
     DB_PORT = os.environ.get('DB_PORT', '3306')
     DB_NAME = os.environ.get('DB_NAME', 'mockfyp_db')
     
-    # MySQL connection string
-    SQLALCHEMY_DATABASE_URI = f'mysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4'
+    # MySQL connection string; DATABASE_URL overrides it (e.g. sqlite:///local.db)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
+        f'mysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4'
+        
+    # Read replicas for GET requests, comma separated; each becomes a
+    # replica_<n> bind (see app/services/replicas.py)
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    SQLALCHEMY_BINDS = {f'replica_{i}': url for i, url in enumerate(DATABASE_REPLICA_URLS)}
+    # Replicas further behind than this many seconds are skipped
+    REPLICA_MAX_LAG = int(os.environ.get('REPLICA_MAX_LAG', 2))
+    REPLICA_LAG_CHECK_INTERVAL = 5
+    # Seconds a client's reads stay on the primary after its own write
+    REPLICA_STICKY_SECONDS = 10
         
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
@@ -28,3 +39,85 @@ class Config:
     JWT_COOKIE_CSRF_PROTECT = False
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+    
+    # Keyset pagination for GET /api/requests
+    REQUESTS_PAGE_SIZE = 50
+    REQUESTS_MAX_PAGE_SIZE = 200
+    
+    # Seconds between bulk view_count flushes; 0 only flushes at shutdown
+    VIEW_COUNT_FLUSH_INTERVAL = int(os.environ.get('VIEW_COUNT_FLUSH_INTERVAL', 10))
+    
+    # SystemLog entries are queued and bulk-inserted by a background writer
+    AUDIT_ASYNC = True
+    AUDIT_QUEUE_SIZE = 10000
+    AUDIT_BATCH_SIZE = 500
+    
+    # Seconds the /api/admin/stats snapshot is served before recounting
+    STATS_CACHE_TTL = 30
+    
+    # Seconds a user's role is trusted for authorization before re-reading it
+    CURRENT_USER_CACHE_TTL = 10
+    
+    # Seconds between pulls of other workers' edits into the search index
+    SEARCH_REFRESH_INTERVAL = 30
+    # 'fulltext' searches with MySQL's FULLTEXT index, 'memory' with the
+    # in-process index; 'auto' uses fulltext whenever the database is MySQL
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+    
+    # In-process indexes (search, matching): seconds between full rebuilds,
+    # which also drop rows other workers deleted, and how far back each
+    # incremental pull re-reads to catch rows committed out of order
+    INDEX_REBUILD_INTERVAL = 3600
+    INDEX_REFRESH_LAG = 60
+    
+    # /api/volunteers/recommended: seconds between pulls of other workers'
+    # edits into the candidate index, seconds a volunteer's history and
+    # blacklist entries are reused, and overrides of the score weights
+    MATCHING_REFRESH_INTERVAL = 30
+    MATCHING_PROFILE_TTL = 60
+    MATCHING_WEIGHTS = {}
+    
+    # Password hashing runs in a process pool; changing the method or its cost
+    # parameters re-hashes each user's password at their next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = 32
+    
+    # Fraction of requests timed for /api/system/metrics; 0 disables the
+    # request hooks and SQL listeners entirely
+    METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 1.0))
+    METRICS_SLOW_STATEMENTS = 10
+    # Prometheus access without a user JWT: a bearer token and/or client
+    # addresses or CIDR networks, comma separated; admins can still use theirs
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()]
+    
+    # Seconds the serialized category list is kept in process, and the
+    # max-age browsers may reuse it for without revalidating
+    CATEGORY_CACHE_TTL = 300
+    CATEGORY_MAX_AGE = 60
+    
+    # 'auto' encodes JSON with orjson when it is installed, else the json module
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
+    # /api/requests/stream: events kept for Last-Event-ID resume, and an
+    # optional SQLite file that fans events out across workers on one host
+    EVENT_BUFFER_SIZE = 1000
+    EVENT_FANOUT_DB = os.environ.get('EVENT_FANOUT_DB')
+    
+    # Scheduled reports: poll for due reports in-process (every worker may
+    # poll; claims keep a report from running twice) or run `flask run-reports`
+    # from cron instead. CSVs are written under UPLOAD_FOLDER/reports.
+    REPORT_SCHEDULER_ENABLED = os.environ.get('REPORT_SCHEDULER_ENABLED', '').lower() in ('1', 'true', 'yes')
+    REPORT_WORKERS = 2
+    # Each run covers rows up to this many seconds ago, leaving room for
+    # transactions that commit after the timestamps they carry
+    REPORT_WINDOW_GRACE = 300
+    
+    # Largest batch the /bulk endpoints accept, and seconds an Idempotency-Key
+    # and its stored response are kept (`flask purge-idempotency-keys`)
+    BULK_MAX_ITEMS = 100
+    IDEMPOTENCY_KEY_TTL = 24 * 3600
+    
+    # Help requests removed per transaction when a user is deleted
+    USER_DELETE_CHUNK_SIZE = 1000
@@ -0,0 +1,119 @@
+"""Drive the read endpoints and EXPLAIN every SELECT they issue.
+
+Run against a seeded database (see init_db.py):
+
+    python explain_queries.py
+
+Exits non-zero when a query plan contains a full table scan that the route
+is not expected to perform.
+"""
+import sys
+from dotenv import load_dotenv
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+load_dotenv()
+
+from app import create_app, db
+from app.models.user import User
+from app.models.request import Category, HelpRequest
+
+# (role, url, full scans allowed) — placeholders are filled from the database
+ROUTES = [
+    ('pin', '/api/requests', False),
+    ('pin', '/api/requests?urgency=high', False),
+    ('pin', '/api/requests?category={category}', False),
+    ('pin', '/api/requests?sort_by=updated_at', False),
+    ('pin', '/api/requests/{request_id}', False),
+    ('pin', '/api/requests/my-requests', False),
+    ('pin', '/api/auth/me', False),
+    ('pin', '/api/users/{csr_id}', False),
+    ('pin', '/api/pin/blacklist', False),
+    ('pin', '/api/pin/shortlist', False),
+    ('pin', '/api/pin/reviews/{csr_id}', False),
+    ('csr', '/api/volunteers/my-offers', False),
+    ('csr', '/api/csr/accepted-tasks', False),
+    ('admin', '/api/system/logs', False),
+    ('admin', '/api/system/logs?action=USER_DEACTIVATED', False),
+    ('admin', '/api/system/audit-trail/{admin_id}', False),
+    # Whole-table reads by design
+    ('pin', '/api/admin/categories', True),
+    ('admin', '/api/admin/stats', True),
+    ('admin', '/api/users', True),
+    ('admin', '/api/system/scheduled-reports', True),
+    ('admin', '/api/system/export-csv', True),
+    ('admin', '/api/admin/users/export-csv', True),
+]
+
+def full_scans(connection, statement, parameters):
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+        return [
+            row[3].split()[1] for row in plan
+            if row[3].startswith('SCAN ') and 'INDEX' not in row[3]
+        ]
+    if dialect == 'mysql':
+        plan = connection.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings().all()
+        return [row['table'] for row in plan if row['type'] == 'ALL']
+    raise SystemExit(f'EXPLAIN is not supported for {dialect}')
+
+def explain(app, captured):
+    scanned = set()
+    with app.app_context():
+        with db.engine.connect() as connection:
+            for statement, parameters in captured:
+                scanned.update(full_scans(connection, statement, parameters))
+    return scanned
+
+def main():
+    app = create_app()
+    client = app.test_client()
+    failures = 0
+    
+    with app.app_context():
+        users = {role: User.query.filter_by(role=role).first() for role in ['admin', 'pin', 'csr']}
+        missing = [role for role, user in users.items() if user is None]
+        if missing:
+            raise SystemExit(f'Seed the database first; no user with role {", ".join(missing)}')
+        
+        tokens = {role: create_access_token(identity=str(user.id)) for role, user in users.items()}
+        category = Category.query.first()
+        help_request = HelpRequest.query.first()
+        placeholders = {
+            'admin_id': users['admin'].id,
+            'csr_id': users['csr'].id,
+            'category': category.name if category else '',
+            'request_id': help_request.id if help_request else 0,
+        }
+        engine = db.engine
+    
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+    
+    for role, url, allow_scan in ROUTES:
+        url = url.format(**placeholders)
+        captured.clear()
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            response = client.get(url, headers={'Authorization': f'Bearer {tokens[role]}'})
+            response.get_data()
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+        
+        scanned = explain(app, captured)
+        if scanned and not allow_scan:
+            failures += 1
+            status = 'FULL SCAN'
+        else:
+            status = 'ok'
+        detail = f' ({", ".join(sorted(scanned))})' if scanned else ''
+        print(f'{status:<9} {response.status_code} GET {url} - {len(captured)} queries{detail}')
+    
+    print(f'\n{failures} route(s) with unexpected full table scans')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,30 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, func
+from werkzeug.security import generate_password_hash
 from app import create_app, db
 from app.models.user import User, UserProfile, VolunteerBlacklist, VolunteerShortlist, VolunteerReview
 from app.models.request import Category, HelpRequest, VolunteerOffer
 from app.models.system import SystemLog, ScheduledReport
+from app.services.ratings import reconcile_ratings
 
-app = create_app()
+URGENCIES = ['low', 'medium', 'high', 'urgent']
+REQUEST_STATUSES = ['pending'] * 6 + ['accepted'] * 2 + ['completed'] * 2
+OFFER_STATUSES = ['pending', 'accepted', 'accepted', 'rejected', 'withdrawn']
+LOCATIONS = ['Downtown', 'Uptown', 'Suburbs', 'Riverside', 'Old Town', 'Harbour', 'Northside', 'Eastgate']
+LOG_ACTIONS = ['TASK_COMPLETED', 'REVIEW_SUBMITTED', 'VOLUNTEER_BLACKLISTED', 'ROLE_ASSIGNED', 'USER_DEACTIVATED']
+WORDS = (
+    'help need groceries moving furniture tutoring math laptop setup pharmacy '
+    'pickup garden dog walk ride appointment paperwork repair cleaning cooking '
+    'weekend morning evening urgent elderly neighbour apartment school homework'
+).split()
+# Synthetic timestamps fall in the year before this instant rather than
+# before the wall clock, so a given --seed always yields the same rows
+SYNTHETIC_EPOCH = datetime(2026, 1, 1)
 
-with app.app_context():
-    print("Dropping all tables...")
-    db.drop_all()
-    
-    print("Creating all tables...")
-    db.create_all()
-    
+def seed_demo_data():
     print("Creating categories...")
     categories = [
         Category(name="Groceries", description="Help with grocery shopping"),
@@ -189,14 +202,163 @@ with app.app_context():
     csr1.profile.total_reviews = 1
     
     db.session.commit()
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+def _insert_batches(model, rows, batch_size):
+    # Core INSERT with a list of parameter sets runs as a single executemany
+    table = model.__table__
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(table), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(table), batch)
+        count += len(batch)
+    db.session.commit()
+    return count
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+def generate_synthetic_data(scale, seed, batch_size, epoch=SYNTHETIC_EPOCH):
+    # Deterministic production-shaped data: for every unit of scale one user
+    # with a profile, two requests, two offers, half a review and five log
+    # entries, timestamped within the year before epoch. All users share one
+    # precomputed password hash.
+    rng = random.Random(seed)
+    now = epoch
+    password_hash = generate_password_hash('password123')
+    category_ids = [c.id for c in Category.query.all()]
+    
+    first_user = _next_id(User)
+    user_ids = range(first_user, first_user + scale)
+    roles = {uid: ('csr' if rng.random() < 0.3 else 'pin') for uid in user_ids}
+    pin_ids = [uid for uid in user_ids if roles[uid] == 'pin'] or list(user_ids)
+    csr_ids = [uid for uid in user_ids if roles[uid] == 'csr'] or list(user_ids)
+    
+    def timestamp():
+        return now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+    
+    def users():
+        for uid in user_ids:
+            created = timestamp()
+            yield {
+                'id': uid, 'email': f'user{uid}@load.test', 'username': f'user{uid}',
+                'password_hash': password_hash, 'role': roles[uid], 'is_active': rng.random() > 0.05,
+                'created_at': created, 'updated_at': created
+            }
+    
+    def profiles():
+        first = _next_id(UserProfile)
+        for offset, uid in enumerate(user_ids):
+            yield {
+                'id': first + offset, 'user_id': uid, 'full_name': f'Load User {uid}',
+                'phone': f'555-{rng.randrange(10000):04d}', 'rating': 0.0, 'total_reviews': 0, 'completed_tasks': 0
+            }
     
-    print("\n✅ Database initialized successfully!")
-    print("\n�� Test Credentials:")
-    print("=" * 50)
-    print("Admin:    admin@mockfyp.com / admin123")
-    print("Manager:  manager@mockfyp.com / manager123")
-    print("PIN 1:    john@mockfyp.com / password123")
-    print("PIN 2:    mary@mockfyp.com / password123")
-    print("CSR 1:    volunteer@company.com / password123")
-    print("CSR 2:    helper@business.com / password123")
-    print("=" * 50)
+    first_request = _next_id(HelpRequest)
+    request_ids = range(first_request, first_request + 2 * scale)
+    
+    def help_requests():
+        for rid in request_ids:
+            created = timestamp()
+            status = rng.choice(REQUEST_STATUSES)
+            yield {
+                'id': rid, 'requester_id': rng.choice(pin_ids),
+                'title': _sentence(rng, 4), 'description': _sentence(rng, 20),
+                'category_id': rng.choice(category_ids), 'location': rng.choice(LOCATIONS),
+                'urgency': rng.choice(URGENCIES), 'status': status, 'view_count': rng.randrange(200),
+                'created_at': created, 'updated_at': created,
+                'completed_at': created + timedelta(days=2) if status == 'completed' else None
+            }
+    
+    def offers():
+        first = _next_id(VolunteerOffer)
+        # (request_id, volunteer_id) is unique
+        seen = set()
+        for offset in range(2 * scale):
+            pair = (rng.choice(request_ids), rng.choice(csr_ids))
+            while pair in seen:
+                pair = (rng.choice(request_ids), rng.choice(csr_ids))
+            seen.add(pair)
+            yield {
+                'id': first + offset, 'request_id': pair[0], 'volunteer_id': pair[1],
+                'status': rng.choice(OFFER_STATUSES), 'message': 'I would like to help!', 'created_at': timestamp()
+            }
+    
+    def reviews():
+        first = _next_id(VolunteerReview)
+        for offset in range(scale // 2):
+            yield {
+                'id': first + offset, 'pin_id': rng.choice(pin_ids), 'volunteer_id': rng.choice(csr_ids),
+                'request_id': rng.choice(request_ids), 'rating': rng.randint(1, 5),
+                'comment': _sentence(rng, 8), 'created_at': timestamp()
+            }
+    
+    def logs():
+        first = _next_id(SystemLog)
+        for offset in range(5 * scale):
+            action = rng.choice(LOG_ACTIONS)
+            yield {
+                'id': first + offset, 'user_id': rng.choice(user_ids), 'action': action,
+                'details': f'{action.replace("_", " ").capitalize()} (synthetic)',
+                'ip_address': f'10.0.{rng.randrange(256)}.{rng.randrange(256)}', 'timestamp': timestamp()
+            }
+    
+    for label, model, rows in [
+        ('users', User, users()),
+        ('profiles', UserProfile, profiles()),
+        ('help requests', HelpRequest, help_requests()),
+        ('volunteer offers', VolunteerOffer, offers()),
+        ('reviews', VolunteerReview, reviews()),
+        ('system logs', SystemLog, logs()),
+    ]:
+        started = time.perf_counter()
+        count = _insert_batches(model, rows, batch_size)
+        print(f"  {label:<17} {count:>10,} rows in {time.perf_counter() - started:6.1f}s")
+    
+    print("Reconciling volunteer ratings...")
+    reconcile_ratings()
+
+def main():
+    parser = argparse.ArgumentParser(description='Reset the database and load demo data.')
+    parser.add_argument('--scale', type=int, default=0,
+                        help='also generate synthetic data for this many users (x2 requests/offers, x5 logs)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for synthetic data')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per bulk INSERT')
+    args = parser.parse_args()
+    
+    app = create_app()
+    
+    with app.app_context():
+        print("Dropping all tables...")
+        db.drop_all()
+        
+        print("Creating all tables...")
+        db.create_all()
+        
+        seed_demo_data()
+        
+        if args.scale > 0:
+            print(f"Generating synthetic data (scale={args.scale:,}, seed={args.seed})...")
+            generate_synthetic_data(args.scale, args.seed, args.batch_size)
+    
+        print("\n✅ Database initialized successfully!")
+        print("\n�� Test Credentials:")
+        print("=" * 50)
+        print("Admin:    admin@mockfyp.com / admin123")
+        print("Manager:  manager@mockfyp.com / manager123")
+        print("PIN 1:    john@mockfyp.com / password123")
+        print("PIN 2:    mary@mockfyp.com / password123")
+        print("CSR 1:    volunteer@company.com / password123")
+        print("CSR 2:    helper@business.com / password123")
+        print("=" * 50)
+
+if __name__ == '__main__':
+    main()
@@ -96,6 +96,17 @@ def run_migrations_online():
 
     connectable = get_engine()
 
+    # Schema objects declared with .ddl_if(dialect=...), such as the MySQL
+    # FULLTEXT index on help_requests, only exist on that dialect
+    def include_object(object, name, type_, reflected, compare_to):
+        ddl_if = getattr(object, '_ddl_if', None)
+        if ddl_if is not None and ddl_if.dialect is not None:
+            return ddl_if.dialect == connectable.dialect.name
+        return True
+
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
+
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
@@ -0,0 +1,31 @@
+"""help request fulltext index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 16:02:41.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MySQL only: other databases search with the in-process index
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    with op.batch_alter_table('help_requests', schema=None) as batch_op:
+        batch_op.create_index('ix_help_requests_fulltext', ['title', 'description', 'location'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    with op.batch_alter_table('help_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_help_requests_fulltext')
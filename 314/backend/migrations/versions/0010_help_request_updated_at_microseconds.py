@@ -0,0 +1,38 @@
+"""help request updated_at microseconds
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 17:20:05.912344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MySQL's DATETIME drops fractional seconds; other databases keep them
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    with op.batch_alter_table('help_requests', schema=None) as batch_op:
+        batch_op.alter_column('updated_at',
+               existing_type=mysql.DATETIME(),
+               type_=mysql.DATETIME(fsp=6),
+               existing_nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    with op.batch_alter_table('help_requests', schema=None) as batch_op:
+        batch_op.alter_column('updated_at',
+               existing_type=mysql.DATETIME(fsp=6),
+               type_=mysql.DATETIME(),
+               existing_nullable=False)
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import select
+from config import Config
+from app import create_app, db
+from app.models.request import Category
+from app.services.replicas import STICKY_COOKIE, STICKY_HEADER, replica_router
+
+@pytest.fixture
+def app(tmp_path):
+    class ReplicaConfig(Config):
+        TESTING = True
+        SECRET_KEY = 'replica-test-secret'
+        JWT_SECRET_KEY = 'replica-test-jwt-secret-of-sufficient-length'
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "primary.db"}'
+        SQLALCHEMY_BINDS = {'replica_0': f'sqlite:///{tmp_path / "replica.db"}'}
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    app = create_app(ReplicaConfig)
+
+    # Each database names its own category, so a read shows where it went
+    @app.route('/_probe')
+    def probe():
+        return {'source': db.session.scalars(select(Category.name)).one()}
+
+    @app.route('/_write', methods=['POST'])
+    def write():
+        return {}, 201
+
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica_0'])
+        db.session.add(Category(name='primary'))
+        db.session.commit()
+        with db.engines['replica_0'].begin() as connection:
+            connection.execute(Category.__table__.insert().values(name='replica'))
+    replica_router.check_lag()
+    yield app
+    replica_router.shutdown()
+    with app.app_context():
+        db.engine.dispose()
+        db.engines['replica_0'].dispose()
+
+def _source(client, **kwargs):
+    return client.get('/_probe', **kwargs).get_json()['source']
+
+def test_reads_go_to_a_healthy_replica(app):
+    assert _source(app.test_client()) == 'replica'
+
+def test_writes_and_locking_reads_go_to_the_primary(app):
+    with app.test_request_context('/_probe'):
+        assert db.session.get_bind(clause=Category.__table__.insert()) is db.engine
+        assert db.session.get_bind(clause=select(Category).with_for_update()) is db.engine
+        assert db.session.get_bind(clause=select(Category)) is db.engines['replica_0']
+
+def test_lagging_replica_is_skipped(app):
+    app.config['REPLICA_LAG_QUERY'] = 'SELECT 100'
+    replica_router.check_lag()
+    assert _source(app.test_client()) == 'primary'
+
+def test_client_reads_its_own_write_from_the_primary(app):
+    client = app.test_client()
+    response = client.post('/_write')
+    assert response.headers[STICKY_HEADER]
+    assert client.get_cookie(STICKY_COOKIE) is not None
+    # The cookie rides along on the next request from the same client...
+    assert _source(client) == 'primary'
+    # ...and the header works for clients that do not keep cookies
+    other = app.test_client()
+    assert _source(other, headers={STICKY_HEADER: response.headers[STICKY_HEADER]}) == 'primary'
+    # Nobody else is affected
+    assert _source(app.test_client()) == 'replica'
+
+def test_preflight_does_not_stick(app):
+    client = app.test_client()
+    assert STICKY_HEADER not in client.options('/_write').headers
+    assert _source(client) == 'replica'
+
+def test_failed_write_does_not_stick(app):
+    client = app.test_client()
+    assert client.post('/_probe').status_code == 405
+    assert STICKY_HEADER not in client.post('/_probe').headers
+    assert _source(client) == 'replica'
+
+def test_forged_or_expired_token_is_ignored(app):
+    assert _source(app.test_client(), headers={STICKY_HEADER: 'primary.forged'}) == 'replica'
+    token = app.test_client().post('/_write').headers[STICKY_HEADER]
+    app.config['REPLICA_STICKY_SECONDS'] = -1
+    assert _source(app.test_client(), headers={STICKY_HEADER: token}) == 'replica'
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event, insert
+from config import Config
+from app import create_app, db
+from app.models.request import Category, HelpRequest
+from app.models.user import User
+
+ROWS = 1000
+
+@pytest.fixture
+def app(tmp_path):
+    class ListingConfig(Config):
+        TESTING = True
+        SECRET_KEY = 'listing-test-secret'
+        JWT_SECRET_KEY = 'listing-test-jwt-secret-of-sufficient-length'
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "listing.db"}'
+        SQLALCHEMY_BINDS = {}
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        REQUESTS_MAX_PAGE_SIZE = ROWS
+
+    app = create_app(ListingConfig)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        pin = User(email='pin@listing.test', username='pin', role='pin', password_hash='x')
+        categories = [Category(name=name) for name in ('Groceries', 'Moving', 'Tutoring', 'Technology')]
+        db.session.add_all([pin, *categories])
+        db.session.commit()
+        now = datetime(2026, 1, 1)
+        db.session.execute(insert(HelpRequest), [{
+            'requester_id': pin.id, 'title': f'Request {i}', 'description': 'Listing test',
+            'category_id': categories[i % len(categories)].id, 'location': 'Downtown',
+            'urgency': 'medium', 'status': 'pending', 'view_count': 0,
+            'created_at': now + timedelta(minutes=i), 'updated_at': now + timedelta(minutes=i),
+        } for i in range(ROWS)])
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+def test_thousand_row_listing_is_one_select(app):
+    client = app.test_client()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(f'/api/requests?limit={ROWS}')
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert len(rows) == ROWS
+    # Every row carries its category without a per-row lookup
+    assert {row['category'] for row in rows} == {'Groceries', 'Moving', 'Tutoring', 'Technology'}
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith('SELECT')
@@ -9,12 +9,20 @@ const api = axios.create({
   withCredentials: false
 });
 
+// After a write the API returns a short-lived X-Read-Primary token; sending
+// it back keeps this client's reads on the primary database so it sees its
+// own write even when replicas lag (the cookie form needs credentials)
+let readPrimaryToken = null;
+
 api.interceptors.request.use(
   (config) => {
     const token = localStorage.getItem('token');
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (readPrimaryToken) {
+      config.headers['X-Read-Primary'] = readPrimaryToken;
+    }
     return config;
   },
   (error) => {
@@ -22,6 +30,14 @@ api.interceptors.request.use(
   }
 );
 
+api.interceptors.response.use((response) => {
+  const readPrimary = response.headers['x-read-primary'];
+  if (readPrimary) {
+    readPrimaryToken = readPrimary;
+  }
+  return response;
+});
+
 const AuthContext = createContext(null);
 
 const AuthProvider = ({ children }) => {
@@ -682,8 +698,15 @@ const Dashboard = () => {
 
   const loadRequests = async () => {
     try {
-      const res = await api.get('/requests');
-      setRequests(res.data);
+      // The listing is paged; follow X-Next-Cursor until the last page
+      const all = [];
+      let cursor = null;
+      do {
+        const res = await api.get('/requests', { params: cursor ? { limit: 200, cursor } : { limit: 200 } });
+        all.push(...res.data);
+        cursor = res.headers['x-next-cursor'];
+      } while (cursor);
+      setRequests(all);
     } catch (err) {
       console.error('Failed to load requests', err);
     }